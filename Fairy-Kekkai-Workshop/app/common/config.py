@@ -420,6 +420,17 @@ class Config(QConfig):
         "OCR", "MinSubtitleDuration", 0.2, RangeValidator(0.1, 10.0), restart=False
     )
 
+    # 同时进行的提取任务数，各任务并行解码视频，OCR引擎按顺序使用
+    concurrentOcrJobs = RangeConfigItem(
+        "OCR", "ConcurrentJobs", 2, RangeValidator(1, 6), restart=False
+    )
+
+    # 解码帧占用内存上限（MB），处理4K或长视频时避免内存占用过高
+    # 命令行使用：--memory_limit_mb
+    ocrMemoryLimit = RangeConfigItem(
+        "OCR", "MemoryLimitMB", 1024, RangeValidator(256, 16384), restart=False
+    )
+
     # 是否启用GPU使用
     # 命令行使用：--use_gpu
     useGpu = ConfigItem("OCR", "UseGpu", True, BoolValidator(), restart=False)
@@ -494,6 +505,45 @@ class Config(QConfig):
         restart=False,
     )
 
+    # 翻译记忆，相同原文直接复用以前的译文
+    useTranslationMemory = ConfigItem(
+        "Translate", "UseTranslationMemory", True, BoolValidator(), restart=False
+    )
+
+    # 增量翻译：原文改动后重新翻译时，只翻译改动的字幕，其余沿用上次的译文
+    incrementalTranslate = ConfigItem(
+        "Translate", "Incremental", True, BoolValidator(), restart=False
+    )
+
+    # 结构化翻译模式：按编号收发字幕文本，时间轴本地拼接，缺失的字幕单独重试
+    translateStructuredMode = ConfigItem(
+        "Translate", "StructuredMode", False, BoolValidator(), restart=False
+    )
+
+    # 同时进行的翻译任务数
+    concurrentTranslateJobs = RangeConfigItem(
+        "Translate", "ConcurrentJobs", 2, RangeValidator(1, 10), restart=False
+    )
+
+    # 每个服务商每分钟的最大请求数，0 表示不限制
+    translateRequestsPerMinute = RangeConfigItem(
+        "Translate", "RequestsPerMinute", 0, RangeValidator(0, 600), restart=False
+    )
+
+    # 批次失败后的最大重试次数
+    translateMaxRetries = RangeConfigItem(
+        "Translate", "MaxRetries", 3, RangeValidator(0, 10), restart=False
+    )
+
+    # 主模型多次重试仍失败时切换的备用模型
+    translateFallbackModel = OptionsConfigItem(
+        "Translate",
+        "FallbackModel",
+        "不使用",
+        OptionsValidator(["不使用", *AI_model_dict.keys()]),
+        restart=False,
+    )
+
     # AI模型选择
     ai_model = OptionsConfigItem(
         "Translate",
@@ -705,6 +755,15 @@ class Config(QConfig):
         restart=False,
     )
 
+    # 从项目界面压制字幕时烧录的内容：仅译文、双语 SRT 或双语 ASS
+    ffmpegSubtitleMode = OptionsConfigItem(
+        "FFmpeg",
+        "SubtitleMode",
+        "bilingual_ass",
+        OptionsValidator(["translated", "bilingual_srt", "bilingual_ass"]),
+        restart=False,
+    )
+
     # 视频码率限制 (可选，为空表示不使用码率限制)
     ffmpegVideoBitrate = ConfigItem("FFmpeg", "VideoBitrate", "", restart=False)
 
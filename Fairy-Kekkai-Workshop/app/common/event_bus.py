@@ -40,10 +40,16 @@ class GlobalEventBus(QObject):
     translate_update_signal = Signal(
         str, str
     )  # 实时翻译更新信号 (task_id, content_chunk)
+    translate_project_requested = Signal(
+        list
+    )  # 项目批量翻译 [(原文路径, 译文路径), ...]
+    translate_rewind_signal = Signal(
+        str, str
+    )  # 批次重试时回退实时翻译内容 (task_id, 需删除的末尾文本)
 
     # 压制相关事件
     ffmpeg_finished_signal = Signal(bool, str)
-    ffmpeg_requested = Signal(str, str)
+    ffmpeg_requested = Signal(str, str, str)  # 视频, 输出, 烧录的字幕（为空时不烧录）
     ffmpeg_update_signal = Signal(
         str, str
     )  # 实时ffmpeg输出更新信号 (task_id, output_chunk)
@@ -900,6 +900,26 @@ class OCRSettingInterface(ScrollArea):
             parent=self.processingGroup,
         )
 
+        # 解码帧内存上限 (256-16384)
+        self.ocrMemoryLimitCard = NumberLineEditSettingCard(
+            cfg.ocrMemoryLimit,
+            FIF.SAVE,
+            self.tr("解码内存上限"),
+            self.tr("处理中解码帧占用内存的上限，4K或长视频可适当调整 (256-16384 MB)"),
+            placeholderText=str(cfg.ocrMemoryLimit.value),
+            validator=QIntValidator(256, 16384),
+            parent=self.processingGroup,
+        )
+
+        # 并发提取任务数 (1-6)
+        self.concurrentOcrJobsCard = RangeSettingCard(
+            cfg.concurrentOcrJobs,
+            FIF.SPEED_HIGH,
+            title=self.tr("并发提取数量"),
+            content=self.tr("同时解码的视频数，OCR识别仍按顺序进行"),
+            parent=self.processingGroup,
+        )
+
         # 最小字幕持续时间 (0.1-10.0)
         self.minSubtitleDurationCard = NumberLineEditSettingCard(
             cfg.minSubtitleDuration,
@@ -1010,6 +1030,8 @@ class OCRSettingInterface(ScrollArea):
         self.processingGroup.addSettingCard(self.ocrImageMaxWidthCard)
         self.processingGroup.addSettingCard(self.framesToSkipCard)
         self.processingGroup.addSettingCard(self.minSubtitleDurationCard)
+        self.processingGroup.addSettingCard(self.ocrMemoryLimitCard)
+        self.processingGroup.addSettingCard(self.concurrentOcrJobsCard)
 
         # 功能开关
         self.featureGroup.addSettingCard(self.useGpuCard)
@@ -1192,6 +1214,58 @@ class TranslateSettingInterface(ScrollArea):
             parent=self.aiGroup,
         )
         self.promptTemplateCard.setFixedHeight(120)
+        self.translationMemoryCard = SwitchSettingCard(
+            FIF.HISTORY,
+            self.tr("翻译记忆"),
+            self.tr("相同原文、语言、模型和Prompt的字幕直接复用以前的译文"),
+            configItem=cfg.useTranslationMemory,
+            parent=self.aiGroup,
+        )
+        self.incrementalTranslateCard = SwitchSettingCard(
+            FIF.EDIT,
+            self.tr("增量翻译"),
+            self.tr("修改原文后重新翻译时，只翻译改动的字幕，其余沿用上次的译文"),
+            configItem=cfg.incrementalTranslate,
+            parent=self.aiGroup,
+        )
+        self.structuredModeCard = SwitchSettingCard(
+            FIF.ALIGNMENT,
+            self.tr("结构化翻译"),
+            self.tr(
+                "按编号发送字幕文本，时间轴由本地拼接，漏译的字幕会单独重试（不使用Prompt模板）"
+            ),
+            configItem=cfg.translateStructuredMode,
+            parent=self.aiGroup,
+        )
+        self.concurrentTranslateJobsCard = RangeSettingCard(
+            cfg.concurrentTranslateJobs,
+            FIF.SPEED_HIGH,
+            self.tr("并发翻译数量"),
+            self.tr("同时翻译的字幕文件数"),
+            parent=self.aiGroup,
+        )
+        self.requestsPerMinuteCard = RangeSettingCard(
+            cfg.translateRequestsPerMinute,
+            FIF.STOP_WATCH,
+            self.tr("每分钟请求数上限"),
+            self.tr("所有翻译任务共享，用于免费接口的频率限制，0 表示不限制"),
+            parent=self.aiGroup,
+        )
+        self.maxRetriesCard = RangeSettingCard(
+            cfg.translateMaxRetries,
+            FIF.SYNC,
+            self.tr("失败重试次数"),
+            self.tr("单个批次遇到限流、超时等临时错误时的最大重试次数"),
+            parent=self.aiGroup,
+        )
+        self.fallbackModelCard = ComboBoxSettingCard(
+            cfg.translateFallbackModel,
+            FIF.CLOUD,
+            self.tr("备用模型"),
+            self.tr("主模型多次重试仍失败时，改用该模型翻译当前批次"),
+            texts=cfg.translateFallbackModel.validator.options,
+            parent=self.aiGroup,
+        )
 
         # Deepseek
         self.deepseekGroup = SettingCardGroup(
@@ -1392,6 +1466,13 @@ class TranslateSettingInterface(ScrollArea):
         # AI参数设置
         self.aiGroup.addSettingCard(self.aiTemperatureCard)
         self.aiGroup.addSettingCard(self.promptTemplateCard)
+        self.aiGroup.addSettingCard(self.translationMemoryCard)
+        self.aiGroup.addSettingCard(self.incrementalTranslateCard)
+        self.aiGroup.addSettingCard(self.structuredModeCard)
+        self.aiGroup.addSettingCard(self.concurrentTranslateJobsCard)
+        self.aiGroup.addSettingCard(self.requestsPerMinuteCard)
+        self.aiGroup.addSettingCard(self.maxRetriesCard)
+        self.aiGroup.addSettingCard(self.fallbackModelCard)
 
         # Deepseek
         self.deepseekGroup.addSettingCard(self.DeepseekApiKeyCard)
@@ -1730,6 +1811,14 @@ class FFmpegSettingInterface(ScrollArea):
             ],
             parent=self.videoProcessingGroup,
         )
+        self.subtitleModeCard = ComboBoxSettingCard(
+            cfg.ffmpegSubtitleMode,
+            FIF.FONT,
+            self.tr("烧录字幕"),
+            self.tr("从项目压制字幕时烧录的内容，双语字幕按时间对齐原文与译文"),
+            texts=[self.tr("仅译文"), self.tr("双语 SRT"), self.tr("双语 ASS")],
+            parent=self.videoProcessingGroup,
+        )
         self.videoBitrateCard = LineEditSettingCard(
             cfg.ffmpegVideoBitrate,
             FIF.SPEED_MEDIUM,
@@ -1830,6 +1919,7 @@ class FFmpegSettingInterface(ScrollArea):
         self.videoProcessingGroup.addSettingCard(self.scaleCard)
         self.videoProcessingGroup.addSettingCard(self.customScaleCard)
         self.videoProcessingGroup.addSettingCard(self.fpsCard)
+        self.videoProcessingGroup.addSettingCard(self.subtitleModeCard)
         self.videoProcessingGroup.addSettingCard(self.videoBitrateCard)
 
         # 性能选项
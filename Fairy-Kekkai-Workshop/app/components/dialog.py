@@ -1,6 +1,7 @@
 import os
 
 from PySide6.QtCore import Qt
+from PySide6.QtGui import QTextCursor
 from PySide6.QtWidgets import QGridLayout, QHBoxLayout
 from qfluentwidgets import (
     LineEdit,
@@ -16,6 +17,17 @@ from qfluentwidgets import (
 from ..common.event_bus import event_bus
 
 
+def append_plain_text(text_edit, text):
+    """在末尾追加文本，不重置整个文档；原本停在底部时保持跟随滚动"""
+    scrollbar = text_edit.verticalScrollBar()
+    at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+    cursor = text_edit.textCursor()
+    cursor.movePosition(QTextCursor.MoveOperation.End)
+    cursor.insertText(text)
+    if at_bottom:
+        scrollbar.setValue(scrollbar.maximum())
+
+
 class BaseInputDialog(MessageBoxBase):
     """基础输入对话框，提供通用功能"""
 
@@ -417,7 +429,6 @@ class TranslateProgressDialog(MessageBoxBase):
     def __init__(self, task=None, parent=None):
         super().__init__(parent)
         self.task = task
-        self.current_content = ""  # 存储当前翻译内容
         self.setup_ui()
         if task:
             self.connect_signals()
@@ -425,8 +436,7 @@ class TranslateProgressDialog(MessageBoxBase):
             if self.task.output_file and os.path.exists(self.task.output_file):
                 try:
                     with open(self.task.output_file, "r", encoding="utf-8") as f:
-                        self.current_content = f.read()
-                        self.textEdit.setPlainText(self.current_content)
+                        self.textEdit.setPlainText(f.read())
                 except Exception as e:
                     print(f"读取翻译文件失败: {e}")
 
@@ -449,19 +459,31 @@ class TranslateProgressDialog(MessageBoxBase):
     def connect_signals(self):
         """连接实时翻译信号"""
         event_bus.translate_update_signal.connect(self.on_translate_update)
+        event_bus.translate_rewind_signal.connect(self.on_translate_rewind)
 
     def on_translate_update(self, task_id, content_chunk):
         """处理实时翻译更新"""
         # 只处理当前任务的更新
         if self.task and str(self.task.id) == task_id:
-            self.current_content += content_chunk
-            self.textEdit.setPlainText(self.current_content)
-            scrollbar = self.textEdit.verticalScrollBar()
-            scrollbar.setValue(scrollbar.maximum())
+            append_plain_text(self.textEdit, content_chunk)
+
+    def on_translate_rewind(self, task_id, discarded):
+        """批次重试时删除该批次已显示的内容"""
+        if self.task and str(self.task.id) == task_id and discarded:
+            # 文档位置按 UTF-16 计数，且 \r\n 插入后只占一个换行
+            text = discarded.replace("\r\n", "\n").replace("\r", "\n")
+            length = len(text.encode("utf-16-le")) // 2
+            cursor = self.textEdit.textCursor()
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            cursor.setPosition(
+                max(0, cursor.position() - length), QTextCursor.MoveMode.KeepAnchor
+            )
+            cursor.removeSelectedText()
 
     def accept(self):
         """重写接受方法，断开信号连接"""
         event_bus.translate_update_signal.disconnect(self.on_translate_update)
+        event_bus.translate_rewind_signal.disconnect(self.on_translate_rewind)
         super().accept()
 
 
@@ -471,7 +493,6 @@ class FFmpegProgressDialog(MessageBoxBase):
     def __init__(self, task=None, parent=None):
         super().__init__(parent)
         self.task = task
-        self.current_content = ""  # 存储当前输出内容
         self.setup_ui()
         if task:
             self.connect_signals()
@@ -500,10 +521,7 @@ class FFmpegProgressDialog(MessageBoxBase):
         """处理实时ffmpeg输出更新"""
         # 只处理当前任务的更新
         if self.task and str(self.task.id) == task_id:
-            self.current_content += output_chunk
-            self.textEdit.setPlainText(self.current_content)
-            scrollbar = self.textEdit.verticalScrollBar()
-            scrollbar.setValue(scrollbar.maximum())
+            append_plain_text(self.textEdit, output_chunk)
 
     def accept(self):
         """重写接受方法，断开信号连接"""
@@ -517,7 +535,6 @@ class ReleaseProgressDialog(MessageBoxBase):
     def __init__(self, task=None, parent=None):
         super().__init__(parent)
         self.task = task
-        self.current_content = ""  # 存储当前输出内容
         self.setup_ui()
         if task:
             self.connect_signals()
@@ -546,10 +563,7 @@ class ReleaseProgressDialog(MessageBoxBase):
         """处理实时上传输出更新"""
         # 只处理当前任务的更新
         if self.task and str(self.task.id) == task_id:
-            self.current_content += output_chunk
-            self.textEdit.setPlainText(self.current_content)
-            scrollbar = self.textEdit.verticalScrollBar()
-            scrollbar.setValue(scrollbar.maximum())
+            append_plain_text(self.textEdit, output_chunk)
 
     def accept(self):
         """重写接受方法，断开信号连接"""
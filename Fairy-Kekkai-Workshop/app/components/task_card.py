@@ -1,4 +1,5 @@
 from PySide6.QtGui import QIcon
+from qfluentwidgets import CaptionLabel
 
 from .base_task_card import BaseItemWidget
 from .dialog import FFmpegProgressDialog, ReleaseProgressDialog, TranslateProgressDialog
@@ -27,6 +28,18 @@ class TranslateItemWidget(BaseItemWidget):
         self.setImage(ai_model)
         self.clicked.connect(self.handleClick)
 
+        # 用量与耗时统计，任务完成后显示
+        self.metricsLabel = CaptionLabel()
+        self.metricsLabel.setTextColor("#8a8a8a", "#a0a0a0")
+        self.infoLayout.addSpacing(10)
+        self.infoLayout.addWidget(self.metricsLabel)
+        self.infoLayout.addStretch(1)
+
+    def updateStatus(self, status, success=True, error_message=""):
+        super().updateStatus(status, success, error_message)
+        self.metricsLabel.setText(getattr(self.task, "metrics_summary", ""))
+        self.metricsLabel.setToolTip(getattr(self.task, "metrics_detail", ""))
+
     def setImage(self, ai_model):
         """设置图标"""
         self.imageLabel.setImage(
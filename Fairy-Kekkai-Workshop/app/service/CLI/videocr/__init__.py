@@ -1,3 +1,13 @@
-from .api import save_subtitles_to_file
+from typing import Any
 
 __all__ = ["save_subtitles_to_file"]
+
+
+def __getattr__(name: str) -> Any:
+    # imported lazily so light modules such as videocr.timecode can be used
+    # without loading the OCR pipeline and its dependencies
+    if name == "save_subtitles_to_file":
+        from .api import save_subtitles_to_file
+
+        return save_subtitles_to_file
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,6 +2,8 @@ import os
 import sys
 
 from . import utils
+from .probe_cache import ProbeCache
+from .progress import ProgressReporter
 from .video import Video
 
 
@@ -30,6 +32,10 @@ def save_subtitles_to_file(
     normalize_to_simplified_chinese=True,
     paddleocr_path=None,
     supportFilesPath=None,
+    use_probe_cache=True,
+    use_frame_index=True,
+    progress_socket=None,
+    memory_limit_mb=1024,
 ) -> None:
 
     if crop_zones is None:
@@ -41,11 +47,18 @@ def save_subtitles_to_file(
         print(f"找不到PaddleOCR路径: {paddleocr_path}")
         return
 
+    probe_cache = ProbeCache() if use_probe_cache else None
+
     try:
-        utils.perform_hardware_check(paddleocr_path, use_gpu)
+        utils.perform_hardware_check(paddleocr_path, use_gpu, probe_cache)
     except SystemExit as e:
         print(e, flush=True)
         sys.exit(1)
+    finally:
+        if probe_cache is not None:
+            probe_cache.save()
+
+    progress = ProgressReporter(progress_socket)
 
     det_model_dir, rec_model_dir, cls_model_dir = utils.resolve_model_dirs(
         lang, use_server_model, supportFilesPath
@@ -59,7 +72,12 @@ def save_subtitles_to_file(
         rec_model_dir,
         cls_model_dir,
         temp_dir,
+        probe_cache,
+        use_frame_index,
+        progress,
     )
+    if probe_cache is not None:
+        probe_cache.save()
     try:
         v.run_ocr(
             use_gpu,
@@ -76,10 +94,13 @@ def save_subtitles_to_file(
             crop_zones,
             ocr_image_max_width,
             normalize_to_simplified_chinese,
+            memory_limit_mb,
         )
     except ValueError as e:
         print(f"Error: {e}", flush=True)
         sys.exit(1)
+    finally:
+        progress.close()
     subtitles = v.get_subtitles(
         sim_threshold,
         max_merge_gap_sec,
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+import av
+
+DEFAULT_MEMORY_LIMIT_MB = 1024
+DEFAULT_MAX_AHEAD_FRAMES = 256
+
+
+def get_frame_nbytes(frame: av.VideoFrame) -> int:
+    return sum(plane.buffer_size for plane in frame.planes)
+
+
+def get_images_nbytes(images_to_process: list[dict[str, Any]] | None) -> int:
+    if not images_to_process:
+        return 0
+    return sum(zone_data["img"].nbytes for zone_data in images_to_process)
+
+
+class InFlightLimiter:
+    """Bounds the bytes held by the decode pipeline and how far the producer may run ahead.
+
+    Only the producer ever blocks. Downstream stages transfer or release their
+    share without waiting, so a stalled frame can always reach the consumer.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        max_ahead: int = DEFAULT_MAX_AHEAD_FRAMES,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_ahead = max_ahead
+        self.used = 0
+        self.peak = 0
+        self._consumed_index = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, nbytes: int, index: int, stop_event: threading.Event) -> bool:
+        """Waits for room for a new frame; returns False if the pipeline was stopped."""
+        with self._cond:
+            while not stop_event.is_set():
+                over_budget = self.used > 0 and self.used + nbytes > self.max_bytes
+                too_far_ahead = index - self._consumed_index >= self.max_ahead
+                if not over_budget and not too_far_ahead:
+                    self._add(nbytes)
+                    return True
+                self._cond.wait(timeout=0.1)
+            return False
+
+    def transfer(self, released: int, added: int) -> None:
+        """Swaps the accounting of a raw frame for the crops made from it."""
+        with self._cond:
+            self.used -= released
+            self._add(added)
+            self._cond.notify_all()
+
+    def release(self, nbytes: int) -> None:
+        if not nbytes:
+            return
+        with self._cond:
+            self.used -= nbytes
+            self._cond.notify_all()
+
+    def advance(self, consumed_index: int) -> None:
+        """Records that the consumer has processed every frame before consumed_index."""
+        with self._cond:
+            self._consumed_index = consumed_index
+            self._cond.notify_all()
+
+    def _add(self, nbytes: int) -> None:
+        self.used += nbytes
+        self.peak = max(self.peak, self.used)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import av
+import numpy as np
+
+# Sidecar layout (the GUI preview loads it through this module as well):
+#   pts            int64[n]  presentation timestamps in stream time_base, sorted
+#   keyframes      int64[k]  frame indices (into pts) of keyframes
+#   time_base      int64[2]  numerator, denominator
+#   start_time_ms  float64   container start offset
+#   source         int64[2]  size and mtime_ns of the video when indexed
+#   version        int64
+INDEX_VERSION = 1
+SIDECAR_SUFFIX = ".frameindex.npz"
+
+
+def get_sidecar_path(video_path: str) -> str:
+    return f"{video_path}{SIDECAR_SUFFIX}"
+
+
+class FrameIndex:
+    """Frame index -> pts -> ms mapping of a video, built from a packet scan."""
+
+    pts: np.ndarray[Any, Any]
+    keyframes: np.ndarray[Any, Any]
+    time_base: tuple[int, int]
+    start_time_ms: float
+
+    def __init__(
+        self,
+        pts: np.ndarray[Any, Any],
+        keyframes: np.ndarray[Any, Any],
+        time_base: tuple[int, int],
+        start_time_ms: float,
+    ) -> None:
+        self.pts = pts
+        self.keyframes = keyframes
+        self.time_base = time_base
+        self.start_time_ms = start_time_ms
+        num, den = time_base
+        self.ms = pts.astype(np.float64) * (num * 1000.0 / den)
+
+    def __len__(self) -> int:
+        return len(self.pts)
+
+    def frame_ms(self, index: int) -> float | None:
+        """Returns the presentation time of a frame in ms, or None if out of range."""
+        if 0 <= index < len(self.ms):
+            return float(self.ms[index])
+        return None
+
+    def index_at_ms(self, ms: float) -> int:
+        """Returns the index of the first frame presented at or after ms."""
+        return int(np.searchsorted(self.ms, ms - 1e-3, side="left"))
+
+    def keyframe_pts_before(self, ms: float) -> int | None:
+        """Returns the pts of the last keyframe presented at or before ms."""
+        if not len(self.keyframes):
+            return None
+        target = self.index_at_ms(ms)
+        pos = int(np.searchsorted(self.keyframes, target, side="right")) - 1
+        if pos < 0:
+            return None
+        return int(self.pts[self.keyframes[pos]])
+
+    def avg_frame_duration_ms(self) -> float:
+        if len(self.ms) < 2:
+            return 0.0
+        return float((self.ms[-1] - self.ms[0]) / (len(self.ms) - 1))
+
+    @classmethod
+    def build(cls, video_path: str) -> FrameIndex | None:
+        """Scans packets (without decoding) and builds the index."""
+        pts_list: list[int] = []
+        key_pts: list[int] = []
+
+        with av.open(video_path) as container:
+            stream = container.streams.video[0]
+            if stream.time_base is None:
+                return None
+            time_base = (stream.time_base.numerator, stream.time_base.denominator)
+            start_time_ms = (
+                container.start_time / 1000.0
+                if container.start_time is not None
+                else 0.0
+            )
+
+            for packet in container.demux(stream):
+                if packet.size == 0:
+                    continue
+                pts = packet.pts if packet.pts is not None else packet.dts
+                if pts is None:
+                    # Timestamps cannot be recovered without decoding.
+                    return None
+                pts_list.append(pts)
+                if packet.is_keyframe:
+                    key_pts.append(pts)
+
+        if not pts_list:
+            return None
+
+        pts = np.unique(np.asarray(pts_list, dtype=np.int64))
+        keyframes = np.searchsorted(pts, np.asarray(sorted(key_pts), dtype=np.int64))
+        return cls(pts, keyframes.astype(np.int64), time_base, start_time_ms)
+
+    def save(self, video_path: str) -> None:
+        st = os.stat(video_path)
+        sidecar = get_sidecar_path(video_path)
+        tmp_path = f"{sidecar}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez(
+                tmp_path,
+                pts=self.pts,
+                keyframes=self.keyframes,
+                time_base=np.asarray(self.time_base, dtype=np.int64),
+                start_time_ms=np.float64(self.start_time_ms),
+                source=np.asarray([st.st_size, st.st_mtime_ns], dtype=np.int64),
+                version=np.int64(INDEX_VERSION),
+            )
+            os.replace(tmp_path, sidecar)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    @classmethod
+    def load(cls, video_path: str) -> FrameIndex | None:
+        """Loads the sidecar if it exists and still matches the video file."""
+        sidecar = get_sidecar_path(video_path)
+        try:
+            st = os.stat(video_path)
+            with np.load(sidecar) as data:
+                if int(data["version"]) != INDEX_VERSION:
+                    return None
+                if list(data["source"]) != [st.st_size, st.st_mtime_ns]:
+                    return None
+                num, den = (int(v) for v in data["time_base"])
+                return cls(
+                    data["pts"],
+                    data["keyframes"],
+                    (num, den),
+                    float(data["start_time_ms"]),
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+    @classmethod
+    def load_or_build(cls, video_path: str) -> FrameIndex | None:
+        index = cls.load(video_path)
+        if index is not None:
+            return index
+
+        try:
+            index = cls.build(video_path)
+        except av.error.FFmpegError:
+            return None
+        if index is not None:
+            index.save(video_path)
+        return index
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+from typing import Any
+
+from . import utils
+
+CACHE_VERSION = 1
+MAX_VIDEO_ENTRIES = 256
+
+
+def get_driver_fingerprint() -> str:
+    """Returns a cheap identifier of the installed NVIDIA driver without running nvidia-smi."""
+    proc_version = "/proc/driver/nvidia/version"
+    if sys.platform.startswith("linux") and os.path.isfile(proc_version):
+        try:
+            with open(proc_version, encoding="utf-8", errors="ignore") as f:
+                return f.readline().strip()
+        except OSError:
+            pass
+
+    smi_path = shutil.which("nvidia-smi")
+    if smi_path:
+        try:
+            st = os.stat(smi_path)
+            return f"{smi_path}:{st.st_size}:{st.st_mtime_ns}"
+        except OSError:
+            pass
+
+    return "none"
+
+
+def get_file_key(path: str) -> str | None:
+    """Builds a cache key from the absolute path, size and modification time of a file."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+
+
+class ProbeCache:
+    """Persistent cache for hardware capability checks and video container probes."""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or os.path.join(utils.get_app_data_dir(), "probe_cache.json")
+        self._dirty = False
+        self._data: dict[str, Any] = self._load()
+
+    def _load(self) -> dict[str, Any]:
+        empty: dict[str, Any] = {"version": CACHE_VERSION, "hardware": {}, "videos": {}}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return empty
+
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return empty
+        data.setdefault("hardware", {})
+        data.setdefault("videos", {})
+        return data
+
+    def save(self) -> None:
+        """Writes the cache back to disk if anything changed."""
+        if not self._dirty:
+            return
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def hardware_key(paddleocr_path: str) -> str:
+        return "|".join(
+            (
+                os.path.abspath(paddleocr_path) if paddleocr_path else "",
+                platform.machine(),
+                platform.processor(),
+                get_driver_fingerprint(),
+            )
+        )
+
+    def get_hardware(self, paddleocr_path: str) -> dict[str, Any]:
+        """Returns the cached capability results for this build and driver (may be empty)."""
+        return dict(self._data["hardware"].get(self.hardware_key(paddleocr_path), {}))
+
+    def update_hardware(self, paddleocr_path: str, **values: Any) -> None:
+        entry = self._data["hardware"].setdefault(self.hardware_key(paddleocr_path), {})
+        entry.update(values)
+        entry["checked_at"] = int(time.time())
+        self._dirty = True
+
+    def get_video(self, path: str) -> dict[str, Any] | None:
+        """Returns cached container properties if the file is unchanged since the probe."""
+        key = get_file_key(path)
+        if key is None:
+            return None
+        entry = self._data["videos"].get(key)
+        if entry is None:
+            return None
+        # Not worth a rewrite on its own; saved with the next insert or eviction
+        entry["last_used"] = int(time.time())
+        return dict(entry["properties"])
+
+    def update_video(self, path: str, **properties: Any) -> None:
+        key = get_file_key(path)
+        if key is None:
+            return
+        videos = self._data["videos"]
+        is_new = key not in videos
+        entry = videos.setdefault(key, {"properties": {}})
+        entry["properties"].update(properties)
+        entry["last_used"] = int(time.time())
+        self._dirty = True
+        if is_new:
+            self._evict_videos()
+
+    def _evict_videos(self) -> None:
+        """Drops the least recently used video entries beyond MAX_VIDEO_ENTRIES."""
+        videos = self._data["videos"]
+        if len(videos) <= MAX_VIDEO_ENTRIES:
+            return
+        oldest = sorted(videos, key=lambda k: videos[k].get("last_used", 0))
+        for key in oldest[: len(videos) - MAX_VIDEO_ENTRIES]:
+            del videos[key]
+        self._dirty = True
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import socket
+import time
+from typing import Any, BinaryIO
+
+# One JSON object per line, e.g.
+#   {"stage": "decode", "current": 41000.0, "total": 1440000.0, "frames": 1230,
+#    "fps": 118.2, "eta": 312.4, "elapsed": 10.4}
+# "decode" counts milliseconds of video, "ocr" counts images.
+#
+# Shared resources are negotiated on the same channel: the CLI sends
+# {"request": "ocr"} and blocks until the GUI answers {"grant": "ocr"},
+# then sends {"release": "ocr"} when done.
+MIN_INTERVAL_SEC = 0.2
+
+
+class ProgressReporter:
+    """Sends rate-limited progress updates to the GUI over a local socket or named pipe."""
+
+    def __init__(self, address: str | None, min_interval: float = MIN_INTERVAL_SEC):
+        self.min_interval = min_interval
+        self._sock: socket.socket | None = None
+        self._pipe: BinaryIO | None = None
+        self._last_sent = 0.0
+        self._stage: str | None = None
+        self._stage_started = 0.0
+        self._recv_buffer = b""
+
+        if address:
+            self._connect(address)
+
+    @property
+    def enabled(self) -> bool:
+        return self._sock is not None or self._pipe is not None
+
+    def _connect(self, address: str) -> None:
+        try:
+            if address.startswith("\\\\.\\pipe\\"):
+                self._pipe = open(address, "r+b", buffering=0)
+            elif hasattr(socket, "AF_UNIX"):
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.connect(address)
+                self._sock = sock
+        except OSError as e:
+            print(f"Warning: Progress channel unavailable ({e}).", flush=True)
+            self.close()
+
+    def _send(self, payload: dict[str, Any]) -> None:
+        data = (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+        try:
+            if self._pipe is not None:
+                self._pipe.write(data)
+            elif self._sock is not None:
+                self._sock.sendall(data)
+        except OSError:
+            # The GUI went away; keep running without progress reporting
+            self.close()
+
+    def _readline(self) -> bytes | None:
+        try:
+            if self._pipe is not None:
+                line = self._pipe.readline()
+                return line or None
+            if self._sock is not None:
+                while b"\n" not in self._recv_buffer:
+                    chunk = self._sock.recv(4096)
+                    if not chunk:
+                        return None
+                    self._recv_buffer += chunk
+                line, self._recv_buffer = self._recv_buffer.split(b"\n", 1)
+                return line
+        except OSError:
+            pass
+        return None
+
+    def acquire(self, resource: str) -> None:
+        """Blocks until the GUI grants exclusive use of a shared resource."""
+        if not self.enabled:
+            return
+
+        self._send({"request": resource})
+        while self.enabled:
+            line = self._readline()
+            if line is None:
+                # Channel closed: nobody is scheduling, so just proceed
+                self.close()
+                return
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("grant") == resource:
+                return
+
+    def release(self, resource: str) -> None:
+        if self.enabled:
+            self._send({"release": resource})
+
+    def update(
+        self,
+        stage: str,
+        current: float,
+        total: float,
+        frames: int | None = None,
+        force: bool = False,
+    ) -> None:
+        """Reports progress of a stage, at most once per min_interval unless forced."""
+        if not self.enabled:
+            return
+
+        now = time.monotonic()
+        if stage != self._stage:
+            self._stage = stage
+            self._stage_started = now
+            force = True
+        if not force and now - self._last_sent < self.min_interval:
+            return
+        self._last_sent = now
+
+        elapsed = now - self._stage_started
+        payload: dict[str, Any] = {
+            "stage": stage,
+            "current": current,
+            "total": total,
+            "elapsed": round(elapsed, 2),
+        }
+        if frames is not None:
+            payload["frames"] = frames
+            payload["fps"] = round(frames / elapsed, 1) if elapsed > 0 else 0.0
+        if elapsed > 0 and current > 0 and total > current:
+            payload["eta"] = round((total - current) * elapsed / current, 1)
+
+        self._send(payload)
+
+    def close(self) -> None:
+        for handle in (self._pipe, self._sock):
+            if handle is None:
+                continue
+            try:
+                handle.close()
+            except OSError:
+                pass
+        self._pipe = None
+        self._sock = None
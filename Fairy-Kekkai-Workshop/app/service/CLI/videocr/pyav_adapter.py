@@ -2,10 +2,14 @@ from __future__ import annotations
 
 from collections.abc import Iterator
 from types import TracebackType
-from typing import TypedDict
+from typing import TYPE_CHECKING, TypedDict
 
 import av
 
+if TYPE_CHECKING:
+    from .frame_index import FrameIndex
+    from .probe_cache import ProbeCache
+
 
 class VideoProperties(TypedDict):
     height: int
@@ -14,7 +18,16 @@ class VideoProperties(TypedDict):
     start_time_offset_ms: float
 
 
-def get_video_properties(path: str) -> VideoProperties:
+def get_video_properties(
+    path: str, probe_cache: ProbeCache | None = None
+) -> VideoProperties:
+    if probe_cache is not None:
+        cached = probe_cache.get_video(path)
+        if cached is not None and all(
+            k in cached for k in VideoProperties.__annotations__
+        ):
+            return cached  # type: ignore[return-value]
+
     properties: VideoProperties = {
         "height": 0,
         "width": 0,
@@ -37,12 +50,16 @@ def get_video_properties(path: str) -> VideoProperties:
         if container.start_time is not None:
             properties["start_time_offset_ms"] = container.start_time / 1000.0
 
+    if probe_cache is not None:
+        probe_cache.update_video(path, **properties)
+
     return properties
 
 
 class Capture:
-    def __init__(self, video_path: str) -> None:
+    def __init__(self, video_path: str, frame_index: FrameIndex | None = None) -> None:
         self.path: str = video_path
+        self.frame_index = frame_index
         self.container: av.container.InputContainer | None = None
         self.stream: av.video.stream.VideoStream | None = None
         self.frame_iterator: Iterator[av.VideoFrame] | None = None
@@ -90,6 +107,11 @@ class Capture:
         if not self.container or not self.stream or not self.stream.time_base:
             return
 
-        target_pts = int((target_ms / 1000.0) / float(self.stream.time_base))
+        target_pts = None
+        if self.frame_index is not None:
+            # Land exactly on the keyframe that precedes the target
+            target_pts = self.frame_index.keyframe_pts_before(target_ms)
+        if target_pts is None:
+            target_pts = int((target_ms / 1000.0) / float(self.stream.time_base))
         self.container.seek(target_pts, stream=self.stream)
         self.frame_iterator = self.container.decode(self.stream)
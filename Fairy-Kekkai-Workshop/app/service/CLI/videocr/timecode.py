@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+
+import numpy as np
+
+# "00:00:01,000 --> 00:00:02,500"; the fraction may be missing, use "." or have more than 3 digits
+TIME_RANGE_PATTERN = re.compile(
+    rb"(\d+):(\d{1,2}):(\d{1,2})(?:[,.](\d+))?\s*-->\s*"
+    rb"(\d+):(\d{1,2}):(\d{1,2})(?:[,.](\d+))?"
+)
+
+
+def ms_to_timestamp(ms: float, separator: str = ",", with_ms: bool = True) -> str:
+    """Formats milliseconds as HH:MM:SS,mmm (or HH:MM:SS) using integer arithmetic.
+
+    Float input is rounded to the microsecond and then truncated, as timedelta did.
+    """
+    ms = round(ms * 1000) // 1000 if ms > 0 else 0
+    seconds, millis = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    if with_ms:
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{millis:03d}"
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def ms_to_timestamps(
+    ms: np.ndarray[Any, Any] | list[float], separator: str = ","
+) -> list[str]:
+    """Formats a whole array of millisecond values at once."""
+    values = np.asarray(ms)
+    if values.dtype.kind == "f":
+        values = np.round(values * 1000) // 1000
+    values = np.maximum(values.astype(np.int64), 0)
+    seconds, millis = np.divmod(values, 1000)
+    minutes, seconds = np.divmod(seconds, 60)
+    hours, minutes = np.divmod(minutes, 60)
+    return [
+        f"{h:02d}:{m:02d}:{s:02d}{separator}{f:03d}"
+        for h, m, s, f in zip(
+            hours.tolist(), minutes.tolist(), seconds.tolist(), millis.tolist()
+        )
+    ]
+
+
+def ms_to_ass_timestamp(ms: float) -> str:
+    """Formats milliseconds as an ASS timestamp (H:MM:SS.cc)."""
+    centis = int(ms) // 10 if ms > 0 else 0
+    seconds, centis = divmod(centis, 100)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}.{centis:02d}"
+
+
+def ms_to_ass_timestamps(ms: np.ndarray[Any, Any] | list[float]) -> list[str]:
+    """Formats an array of millisecond values as ASS timestamps (H:MM:SS.cc)."""
+    values = np.maximum(np.asarray(ms, dtype=np.int64), 0) // 10
+    seconds, centis = np.divmod(values, 100)
+    minutes, seconds = np.divmod(seconds, 60)
+    hours, minutes = np.divmod(minutes, 60)
+    return [
+        f"{h:d}:{m:02d}:{s:02d}.{c:02d}"
+        for h, m, s, c in zip(
+            hours.tolist(), minutes.tolist(), seconds.tolist(), centis.tolist()
+        )
+    ]
+
+
+def timestamp_to_ms(time_str: str) -> int:
+    """Parses HH:MM:SS or MM:SS, optionally with a ,mmm/.mmm fraction, into milliseconds."""
+    parts = time_str.strip().split(":")
+    if len(parts) not in (2, 3):
+        raise ValueError(f'Time data "{time_str}" does not match format "%H:%M:%S"')
+    seconds, _, fraction = parts[-1].replace(",", ".").partition(".")
+    ms = int(seconds) * 1000 + (int(fraction[:3].ljust(3, "0")) if fraction else 0)
+    ms += int(parts[-2]) * 60000
+    if len(parts) == 3:
+        ms += int(parts[0]) * 3600000
+    return ms
+
+
+def parse_time_range(line: bytes | str) -> tuple[int, int] | None:
+    """Parses an SRT timing line into (start_ms, end_ms), or None if it is not one."""
+    if isinstance(line, str):
+        line = line.encode("utf-8")
+    match = TIME_RANGE_PATTERN.search(line)
+    if not match:
+        return None
+    h1, m1, s1, f1, h2, m2, s2, f2 = match.groups()
+    # called once per cue when reading subtitle files, so kept inline
+    return (
+        int(h1) * 3600000
+        + int(m1) * 60000
+        + int(s1) * 1000
+        + (int(f1[:3].ljust(3, b"0")) if f1 else 0),
+        int(h2) * 3600000
+        + int(m2) * 60000
+        + int(s2) * 1000
+        + (int(f2[:3].ljust(3, b"0")) if f2 else 0),
+    )
+
+
+def format_time_range(start_ms: float, end_ms: float) -> str:
+    """Formats an SRT timing line."""
+    return f"{ms_to_timestamp(start_ms)} --> {ms_to_timestamp(end_ms)}"
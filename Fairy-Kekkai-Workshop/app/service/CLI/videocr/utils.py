@@ -1,14 +1,17 @@
+from __future__ import annotations
+
 import datetime
 import os
 import shutil
 import subprocess
 import sys
-from typing import IO, Any
+from typing import IO, TYPE_CHECKING, Any
 
 import av
 import numpy as np
 from cpuid import cpuid, xgetbv  # type: ignore
 
+from . import timecode
 from .lang_dictionaries import (
     ARABIC_LANGS,
     CYRILLIC_LANGS,
@@ -18,6 +21,9 @@ from .lang_dictionaries import (
 )
 from .models import PredictedText
 
+if TYPE_CHECKING:
+    from .probe_cache import ProbeCache
+
 ALIGNMENT_MAP = {
     "bottom-left": "an1",
     "bottom-center": "an2",
@@ -34,32 +40,17 @@ VALID_ALIGNMENT_NAMES = set(ALIGNMENT_MAP.keys())
 
 def get_ms_from_time_str(time_str: str) -> float:
     """Convert time string to milliseconds."""
-    t = [float(x) for x in time_str.split(":")]
-    if len(t) == 3:
-        td = datetime.timedelta(hours=t[0], minutes=t[1], seconds=t[2])
-    elif len(t) == 2:
-        td = datetime.timedelta(minutes=t[0], seconds=t[1])
-    else:
-        raise ValueError(f'Time data "{time_str}" does not match format "%H:%M:%S"')
-    return td.total_seconds() * 1000
+    return float(timecode.timestamp_to_ms(time_str))
 
 
 def get_srt_timestamp(frame_index: int, fps: float, offset_ms: float = 0.0) -> str:
     """Convert frame index into SRT timestamp."""
-    td = datetime.timedelta(milliseconds=(frame_index / fps * 1000 + offset_ms))
-    ms = td.microseconds // 1000
-    m, s = divmod(td.seconds, 60)
-    h, m = divmod(m, 60)
-    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+    return timecode.ms_to_timestamp(frame_index / fps * 1000 + offset_ms)
 
 
 def get_srt_timestamp_from_ms(ms: float) -> str:
     """Convert milliseconds into SRT timestamp."""
-    td = datetime.timedelta(milliseconds=ms)
-    minutes, seconds = divmod(td.seconds, 60)
-    hours, minutes = divmod(minutes, 60)
-    milliseconds = td.microseconds // 1000
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+    return timecode.ms_to_timestamp(ms)
 
 
 def frame_to_array(frame: av.VideoFrame, fmt: str) -> np.ndarray[Any, Any]:
@@ -174,12 +165,18 @@ def resolve_model_dirs(
     return (os.path.join(det_path, det_sub), os.path.join(rec_path, rec_sub), cls_path)
 
 
-def perform_hardware_check(paddleocr_path: str, use_gpu: bool) -> None:
+def perform_hardware_check(
+    paddleocr_path: str, use_gpu: bool, probe_cache: ProbeCache | None = None
+) -> None:
     """Checks if the current system supports the hardware requirements."""
     error_prefix = "Unsupported Hardware Error:"
     warning_prefix = "Hardware Check Warning:"
+    cached = probe_cache.get_hardware(paddleocr_path) if probe_cache else {}
 
     def has_avx() -> bool:
+        if "avx" in cached:
+            return bool(cached["avx"])
+
         # CPUID leaf 1: Check AVX and OSXSAVE flags
         _, _, ecx, _ = cpuid(1)
         osxsave = bool(ecx & (1 << 27))
@@ -194,7 +191,10 @@ def perform_hardware_check(paddleocr_path: str, use_gpu: bool) -> None:
             except Exception:
                 ymm_supported = False
 
-        return avx and ymm_supported
+        result = avx and ymm_supported
+        if probe_cache is not None:
+            probe_cache.update_hardware(paddleocr_path, avx=result)
+        return result
 
     def check_cpu() -> None:
         try:
@@ -221,18 +221,26 @@ def perform_hardware_check(paddleocr_path: str, use_gpu: bool) -> None:
     def parse_version(v_str: str) -> tuple[int, ...]:
         return tuple(map(int, v_str.split(".")))
 
+    def query_gpu() -> str:
+        if "gpu_info" in cached:
+            return str(cached["gpu_info"])
+
+        command = [
+            "nvidia-smi",
+            "--query-gpu=driver_version,compute_cap",
+            "--format=csv,noheader",
+        ]
+        result = subprocess.run(
+            command, capture_output=True, text=True, check=True, encoding="utf-8"
+        )
+        first_gpu_info = result.stdout.strip().split("\n")[0]
+        if first_gpu_info and probe_cache is not None:
+            probe_cache.update_hardware(paddleocr_path, gpu_info=first_gpu_info)
+        return first_gpu_info
+
     def check_gpu() -> None:
         try:
-            command = [
-                "nvidia-smi",
-                "--query-gpu=driver_version,compute_cap",
-                "--format=csv,noheader",
-            ]
-            result = subprocess.run(
-                command, capture_output=True, text=True, check=True, encoding="utf-8"
-            )
-
-            first_gpu_info = result.stdout.strip().split("\n")[0]
+            first_gpu_info = query_gpu()
             if not first_gpu_info:
                 raise SystemExit(
                     f"{error_prefix} GPU mode enabled, but 'nvidia-smi' returned no GPU info."
@@ -306,6 +314,45 @@ def is_process_running(pid: int) -> bool:
     return False
 
 
+def get_peak_rss_mb() -> float | None:
+    """Returns the peak resident memory of this process in MB, if the platform reports it."""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.psapi.GetProcessMemoryInfo(
+                handle, ctypes.byref(counters), counters.cb
+            ):
+                return None
+            return counters.PeakWorkingSetSize / (1024 * 1024)
+
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except (OSError, AttributeError, ImportError):
+        return None
+
+
 def create_clean_temp_dir(temp_dir: str) -> str:
     """Cleans up orphaned temporary directories from previous crashed runs and creates a fresh one for the current process."""
     # current_pid = os.getpid()
@@ -335,16 +382,22 @@ def create_clean_temp_dir(temp_dir: str) -> str:
     return temp_dir
 
 
-def log_error(message: str, log_name: str = "error_log.txt") -> str:
-    """Saves errors to a log file."""
+def get_app_data_dir() -> str:
+    """Returns the per-user VideOCR data directory, creating it if needed."""
     if sys.platform == "win32":
-        log_dir = os.path.join(
+        data_dir = os.path.join(
             os.getenv("LOCALAPPDATA") or os.path.expanduser("~"), "VideOCR"
         )
     else:
-        log_dir = os.path.join(os.path.expanduser("~"), ".config", "VideOCR")
+        data_dir = os.path.join(os.path.expanduser("~"), ".config", "VideOCR")
+
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
 
-    os.makedirs(log_dir, exist_ok=True)
+def log_error(message: str, log_name: str = "error_log.txt") -> str:
+    """Saves errors to a log file."""
+    log_dir = get_app_data_dir()
 
     log_path = os.path.join(log_dir, log_name)
     timestamp = datetime.datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
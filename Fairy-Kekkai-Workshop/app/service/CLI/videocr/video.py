@@ -16,8 +16,17 @@ import numpy as np
 import wordninja_enhanced as wordninja  # type: ignore
 from PIL import Image
 
-from . import utils
+from . import timecode, utils
+from .backpressure import (
+    DEFAULT_MEMORY_LIMIT_MB,
+    InFlightLimiter,
+    get_frame_nbytes,
+    get_images_nbytes,
+)
+from .frame_index import FrameIndex
 from .models import PredictedFrames, PredictedSubtitle
+from .probe_cache import ProbeCache
+from .progress import ProgressReporter
 from .pyav_adapter import Capture, get_video_properties
 
 
@@ -40,6 +49,9 @@ class Video:
     frame_timestamps: dict[int, float]
     start_time_offset_ms: float
     avg_frame_duration_ms: float
+    frame_index: FrameIndex | None
+    frame_index_offset: int
+    progress: ProgressReporter | None
 
     def __init__(
         self,
@@ -49,6 +61,9 @@ class Video:
         rec_model_dir: str,
         cls_model_dir: str,
         temp_dir: str,
+        probe_cache: ProbeCache | None = None,
+        use_frame_index: bool = True,
+        progress: ProgressReporter | None = None,
     ) -> None:
         self.path = path
         self.paddleocr_path = paddleocr_path
@@ -60,11 +75,15 @@ class Video:
         self.start_time_offset_ms = 0.0
         self.avg_frame_duration_ms = 0.0
 
-        props = get_video_properties(self.path)
+        self.frame_index = FrameIndex.load_or_build(path) if use_frame_index else None
+
+        props = get_video_properties(self.path, probe_cache)
         self.height = props["height"]
         self.width = props["width"]
         self.duration_ms = props["duration_ms"]
         self.start_time_offset_ms = props["start_time_offset_ms"]
+        self.frame_index_offset = 0
+        self.progress = progress if progress is not None and progress.enabled else None
 
     def run_ocr(
         self,
@@ -82,6 +101,7 @@ class Video:
         crop_zones: list[dict[str, int]],
         ocr_image_max_width: int,
         normalize_to_simplified_chinese: bool,
+        memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB,
     ) -> None:
         conf_threshold_ratio = conf_threshold / 100
         ssim_threshold_ratio = ssim_threshold / 100
@@ -99,15 +119,16 @@ class Video:
 
         target_end_ms = None
         target_end_str = "Unknown"
+        progress_total_ms = 0.0
 
         if time_end:
             user_end_ms = utils.get_ms_from_time_str(time_end)
             target_end_ms = user_end_ms + self.start_time_offset_ms
-            target_end_str = utils.get_srt_timestamp_from_ms(user_end_ms).split(",")[0]
+            target_end_str = timecode.ms_to_timestamp(user_end_ms, with_ms=False)
+            progress_total_ms = user_end_ms - user_start_ms
         elif self.duration_ms > 0:
-            target_end_str = utils.get_srt_timestamp_from_ms(self.duration_ms).split(
-                ","
-            )[0]
+            target_end_str = timecode.ms_to_timestamp(self.duration_ms, with_ms=False)
+            progress_total_ms = self.duration_ms - user_start_ms
 
         for zone in crop_zones:
             if zone["y"] >= self.height:
@@ -206,13 +227,14 @@ class Video:
         processed_queue: queue.Queue[Any] = queue.Queue(maxsize=100)
         write_queue: queue.Queue[Any] = queue.Queue(maxsize=200)
         start_index_queue: queue.Queue[Any] = queue.Queue()
+        limiter = InFlightLimiter(memory_limit_mb * 1024 * 1024)
         stop_event = threading.Event()
         drain_event = threading.Event()
         error_list: list[Exception] = []
 
         def producer_thread() -> None:
             try:
-                with Capture(self.path) as v:
+                with Capture(self.path, self.frame_index) as v:
                     is_seeking = user_start_ms > 0
 
                     if is_seeking:
@@ -228,10 +250,6 @@ class Video:
                         if not success:
                             break
 
-                        curr_str = utils.get_srt_timestamp_from_ms(
-                            timestamp_ms - self.start_time_offset_ms
-                        ).split(",")[0]
-
                         # Check Start Time
                         if is_seeking:
                             if timestamp_ms < target_start_ms:
@@ -248,17 +266,23 @@ class Video:
                             first_queued = True
 
                         should_process_frame = current_index % modulo == 0
+                        nbytes = (
+                            get_frame_nbytes(raw_frame) if should_process_frame else 0
+                        )
+                        if not limiter.acquire(nbytes, current_index, stop_event):
+                            break
+
                         if should_process_frame:
                             raw_queue.put(
                                 (
                                     current_index,
                                     timestamp_ms,
                                     raw_frame,
-                                    curr_str,
+                                    nbytes,
                                 )
                             )
                         else:
-                            raw_queue.put((current_index, timestamp_ms, None, curr_str))
+                            raw_queue.put((current_index, timestamp_ms, None, 0))
 
                         current_index += 1
 
@@ -286,7 +310,7 @@ class Video:
                         raw_queue.put(None)
                         break
 
-                    current_index, timestamp_ms, raw_frame, curr_str = item
+                    current_index, timestamp_ms, raw_frame, raw_nbytes = item
 
                     if raw_frame is None:
                         processed_queue.put(
@@ -294,7 +318,6 @@ class Video:
                                 current_index,
                                 timestamp_ms,
                                 None,
-                                curr_str,
                             )
                         )
                         continue
@@ -383,12 +406,14 @@ class Video:
                             }
                         )
 
+                    # Only the crops stay in flight from here on
+                    limiter.transfer(raw_nbytes, get_images_nbytes(images_to_process))
+
                     processed_queue.put(
                         (
                             current_index,
                             timestamp_ms,
                             images_to_process,
-                            curr_str,
                         )
                     )
 
@@ -408,6 +433,7 @@ class Video:
 
                     frame_path, img = item
                     Image.fromarray(img).save(frame_path, quality=95, subsampling=0)
+                    limiter.release(img.nbytes)
 
             except Exception as e:
                 error_list.append(e)
@@ -462,17 +488,27 @@ class Video:
                             break
                         continue
 
-                    current_index, timestamp_ms, images_to_process, curr_str = item
-                    buffer[current_index] = (timestamp_ms, images_to_process, curr_str)
+                    current_index, timestamp_ms, images_to_process = item
+                    buffer[current_index] = (timestamp_ms, images_to_process)
 
                     # Process buffer sequentially
                     while expected_index in buffer:
-                        timestamp_ms, images_to_process, curr_str = buffer.pop(
-                            expected_index
-                        )
+                        timestamp_ms, images_to_process = buffer.pop(expected_index)
                         self.frame_timestamps[expected_index] = timestamp_ms
 
-                        if current_index % 15 == 0:
+                        if self.progress is not None:
+                            self.progress.update(
+                                "decode",
+                                timestamp_ms - target_start_ms,
+                                progress_total_ms,
+                                frames=expected_index + 1,
+                            )
+                        elif current_index % 15 == 0:
+                            # formatted only when printed, not for every decoded frame
+                            curr_str = timecode.ms_to_timestamp(
+                                timestamp_ms - self.start_time_offset_ms,
+                                with_ms=False,
+                            )
                             print(
                                 f"\rStep 1/2: Processing video... Current: {curr_str} / {target_end_str}, Frame: {expected_index + 1}",
                                 end="",
@@ -494,6 +530,7 @@ class Video:
                                         )
                                         if score > ssim_threshold_ratio:
                                             prev_samples[zone_idx] = sample
+                                            limiter.release(img.nbytes)
                                             continue
                                     prev_samples[zone_idx] = sample
 
@@ -503,13 +540,22 @@ class Video:
                                 frame_paths.append(frame_path)
 
                         expected_index += 1
+                        limiter.advance(expected_index)
 
                 if not error_list and expected_index is not None and expected_index > 0:
                     last_idx = expected_index - 1
                     final_ms = self.frame_timestamps.get(last_idx, 0)
-                    final_str = utils.get_srt_timestamp_from_ms(
-                        final_ms - self.start_time_offset_ms
-                    ).split(",")[0]
+                    if self.progress is not None:
+                        self.progress.update(
+                            "decode",
+                            progress_total_ms,
+                            progress_total_ms,
+                            frames=expected_index,
+                            force=True,
+                        )
+                    final_str = timecode.ms_to_timestamp(
+                        final_ms - self.start_time_offset_ms, with_ms=False
+                    )
 
                     if target_end_ms is not None:
                         print(
@@ -568,7 +614,20 @@ class Video:
 
         ocr_end = expected_index if expected_index is not None else 0
 
-        if len(self.frame_timestamps) > 1:
+        peak_rss_mb = utils.get_peak_rss_mb()
+        peak_rss_str = f"{peak_rss_mb:.0f} MB" if peak_rss_mb is not None else "n/a"
+        print(
+            f"Memory: peak resident {peak_rss_str}, "
+            f"peak frames in flight {limiter.peak / (1024 * 1024):.0f} MB "
+            f"(limit {memory_limit_mb} MB)",
+            flush=True,
+        )
+
+        self._align_frame_index()
+
+        if self.frame_index is not None:
+            self.avg_frame_duration_ms = self.frame_index.avg_frame_duration_ms()
+        elif len(self.frame_timestamps) > 1:
             min_idx = min(self.frame_timestamps.keys())
             max_idx = max(self.frame_timestamps.keys())
             if max_idx > min_idx:
@@ -623,6 +682,10 @@ class Video:
 
         process = None
 
+        if self.progress is not None:
+            print("Waiting for the OCR engine...", flush=True)
+            self.progress.acquire("ocr")
+
         try:
             process = subprocess.Popen(
                 args,
@@ -660,11 +723,19 @@ class Video:
                             current_image = os.path.basename(match.group(1)).strip()
                             ocr_outputs[current_image] = []
                             ocr_image_index += 1
-                            print(
-                                f"\rStep 2/2: Performing OCR on image {ocr_image_index} of {total_images}",
-                                end="",
-                                flush=True,
-                            )
+                            if self.progress is not None:
+                                self.progress.update(
+                                    "ocr",
+                                    ocr_image_index,
+                                    total_images,
+                                    force=ocr_image_index == total_images,
+                                )
+                            else:
+                                print(
+                                    f"\rStep 2/2: Performing OCR on image {ocr_image_index} of {total_images}",
+                                    end="",
+                                    flush=True,
+                                )
                     elif current_image and "[[" in line:
                         try:
                             match = re.search(r"ppocr INFO:\s*(\[.+\])", line)
@@ -760,6 +831,8 @@ class Video:
             raise
 
         finally:
+            if self.progress is not None:
+                self.progress.release("ocr")
             shutil.rmtree(temp_dir, ignore_errors=True)
 
     def get_subtitles(
@@ -928,14 +1001,43 @@ class Video:
 
     def _get_srt_timestamps(self, sub: PredictedSubtitle) -> tuple[str, str]:
         start_ms, end_ms = self._get_subtitle_ms_times(sub)
-        start_time = utils.get_srt_timestamp_from_ms(start_ms)
-        end_time = utils.get_srt_timestamp_from_ms(end_ms)
-        return start_time, end_time
+        return timecode.ms_to_timestamp(start_ms), timecode.ms_to_timestamp(end_ms)
+
+    def _align_frame_index(self) -> None:
+        """Maps decoded frame numbers onto the frame index, dropping it on mismatch."""
+        if self.frame_index is None or not self.frame_timestamps:
+            return
+
+        first_idx = min(self.frame_timestamps)
+        first_ms = self.frame_timestamps[first_idx]
+        offset = self.frame_index.index_at_ms(first_ms) - first_idx
+        indexed_ms = self.frame_index.frame_ms(first_idx + offset)
+
+        last_idx = max(self.frame_timestamps)
+        indexed_last_ms = self.frame_index.frame_ms(last_idx + offset)
+
+        if (
+            indexed_ms is None
+            or indexed_last_ms is None
+            or abs(indexed_ms - first_ms) > 1
+            or abs(indexed_last_ms - self.frame_timestamps[last_idx]) > 1
+        ):
+            # Decoder output does not line up with the packet scan (e.g. dropped frames)
+            self.frame_index = None
+            return
+
+        self.frame_index_offset = offset
 
     def _get_subtitle_ms_times(self, sub: PredictedSubtitle) -> tuple[float, float]:
         start_time_ms = self.frame_timestamps.get(sub.index_start, 0)
         end_time_ms = self.frame_timestamps.get(sub.index_end + 1)
 
+        # Past the last decoded frame the index still knows when the next frame starts
+        if end_time_ms is None and self.frame_index is not None:
+            end_time_ms = self.frame_index.frame_ms(
+                sub.index_end + 1 + self.frame_index_offset
+            )
+
         # For the end time, we try to get the timestamp of the next frame, if it doesn't exist, we fall back to estimating duration of last frame
         if end_time_ms is None:
             last_frame_ms = self.frame_timestamps.get(sub.index_end, start_time_ms)
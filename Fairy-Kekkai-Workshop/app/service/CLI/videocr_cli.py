@@ -231,6 +231,30 @@ def main():
         default=False,
         help="Allow the system to sleep during processing (default: false)",
     )
+    parser.add_argument(
+        "--use_probe_cache",
+        type=lambda x: x.lower() == "true",
+        default=True,
+        help="Reuse cached hardware checks and video probes between runs (default: true)",
+    )
+    parser.add_argument(
+        "--use_frame_index",
+        type=lambda x: x.lower() == "true",
+        default=True,
+        help="Build or reuse a frame timestamp index stored next to the video (default: true)",
+    )
+    parser.add_argument(
+        "--memory_limit_mb",
+        type=int,
+        default=1024,
+        help="Upper bound in MB for decoded frames held in memory at once (default: 1024)",
+    )
+    parser.add_argument(
+        "--progress_socket",
+        type=str,
+        default=None,
+        help="Local socket or named pipe that receives JSON-lines progress updates",
+    )
     parser.add_argument(
         "--paddleocr_path",
         type=str,
@@ -255,6 +279,9 @@ def main():
                     f"Start Time ({args.time_start}) cannot be after End Time ({args.time_end})."
                 )
 
+        if args.memory_limit_mb <= 0:
+            raise ValueError("--memory_limit_mb must be a positive number.")
+
         crop_zones = []
         if not args.use_fullframe:
             zone1_vars = [args.crop_x, args.crop_y, args.crop_width, args.crop_height]
@@ -336,6 +363,10 @@ def main():
                 ocr_image_max_width=args.ocr_image_max_width,
                 paddleocr_path=args.paddleocr_path,
                 supportFilesPath=args.supportFilesPath,
+                use_probe_cache=args.use_probe_cache,
+                use_frame_index=args.use_frame_index,
+                progress_socket=args.progress_socket,
+                memory_limit_mb=args.memory_limit_mb,
             )
     except ValueError as e:
         print(f"Error: {e}")
@@ -19,6 +19,8 @@ class FFmpegTask:
         self.args = args
         self.input_file = args["video_path"]
         self.output_file = args["output_path"]
+        # 烧录到画面中的字幕文件，为空时不烧录
+        self.subtitle_file = args.get("subtitle_path", "")
         self.status = "等待中"  # 等待中, 压制中, 已完成, 失败
         self.progress = 0
         self.error_message = ""
@@ -105,12 +107,13 @@ class FFmpegProcess(QObject):
             else:
                 cmd.extend(["-an"])  # 无音频流，不编码音频
 
-        # 视频缩放
+        # 视频滤镜：先缩放再烧录字幕，字幕按输出分辨率渲染
+        video_filters = []
         scale_option = cfg.ffmpegScale.value
         if scale_option != "none":
             if scale_option == "custom":
                 if cfg.ffmpegCustomScale.value:
-                    cmd.extend(["-vf", f"scale={cfg.ffmpegCustomScale.value}"])
+                    video_filters.append(f"scale={cfg.ffmpegCustomScale.value}")
             else:
                 resolution_map = {
                     "720p": "1280:720",
@@ -119,7 +122,13 @@ class FFmpegProcess(QObject):
                     "2160p": "3840:2160",
                 }
                 if scale_option in resolution_map:
-                    cmd.extend(["-vf", f"scale={resolution_map[scale_option]}"])
+                    video_filters.append(f"scale={resolution_map[scale_option]}")
+        if self.task.subtitle_file:
+            video_filters.append(
+                f"subtitles={self._escape_filter_path(self.task.subtitle_file)}"
+            )
+        if video_filters:
+            cmd.extend(["-vf", ",".join(video_filters)])
 
         # 帧率设置
         fps_option = cfg.ffmpegFps.value
@@ -151,6 +160,17 @@ class FFmpegProcess(QObject):
 
         return cmd
 
+    @staticmethod
+    def _escape_filter_path(path):
+        """转义滤镜参数中的文件路径，如 Windows 盘符的冒号，需要经过两层转义"""
+        path = str(path).replace("\\", "/")
+        # 第一层：滤镜参数值
+        path = path.replace(":", "\\:").replace("'", "\\'")
+        # 第二层：滤镜图
+        for char in "\\'[],;":
+            path = path.replace(char, "\\" + char)
+        return path
+
     def _has_audio_stream(self):
         """检测输入文件是否有音频流"""
         try:
@@ -0,0 +1,58 @@
+# coding:utf-8
+
+import re
+from collections import Counter
+
+# 片假名词（人名、地名、符卡名等多为片假名）
+KATAKANA_TERM = re.compile(r"[ァ-ヺー]{3,}")
+# 带敬称的汉字人名，如「霊夢さん」「紫様」
+HONORIFIC_NAME = re.compile(r"([一-鿿々]{1,4})(?:さん|さま|様|ちゃん|くん|君|殿|先輩)")
+# 英文专有名词
+LATIN_TERM = re.compile(r"\b[A-Z][A-Za-z]{2,}\b")
+
+
+def _iter_subtitle_text(raw_content: str):
+    """只取字幕文本行，跳过序号和时间轴"""
+    for line in raw_content.splitlines():
+        line = line.strip()
+        if not line or line.isdigit() or "-->" in line:
+            continue
+        yield line
+
+
+def _find_terms(raw_content: str):
+    for line in _iter_subtitle_text(raw_content):
+        yield from KATAKANA_TERM.findall(line)
+        yield from HONORIFIC_NAME.findall(line)
+        yield from LATIN_TERM.findall(line)
+
+
+def extract_glossary(contents, min_episodes=2, min_count=3, max_terms=50):
+    """从多集字幕原文中提取反复出现的人名与专有名词，完全在本地进行
+
+    按出现的集数、总次数排序，被更长词条覆盖的片段会被去掉
+    """
+    total = Counter()
+    episode_count = Counter()
+    for content in contents:
+        terms = Counter(_find_terms(content))
+        total.update(terms)
+        episode_count.update(terms.keys())
+
+    min_episodes = max(1, min(min_episodes, len(contents)))
+    candidates = [
+        term
+        for term, count in total.items()
+        if episode_count[term] >= min_episodes and count >= min_count
+    ]
+    # 「レイム」总是作为「ハクレイレイム」的一部分出现时只保留长的
+    candidates = [
+        term
+        for term in candidates
+        if not any(
+            term != other and term in other and total[other] >= total[term] * 0.8
+            for other in candidates
+        )
+    ]
+    candidates.sort(key=lambda term: (-episode_count[term], -total[term], term))
+    return candidates[:max_terms]
@@ -1,13 +1,20 @@
 # ocr_service.py
 
+import json
 import os
+import uuid
+from collections import deque
 
 from PySide6.QtCore import QObject, QProcess, QTimer, Signal
+from PySide6.QtNetwork import QLocalServer
 
 from ..common.config import cfg
 from ..common.event_bus import event_bus
 from ..common.logger import Logger
 
+# 进度刷新间隔（毫秒），CLI 的进度更新会在此间隔内合并
+PROGRESS_REFRESH_INTERVAL = 250
+
 
 class OCRTask:
     """OCR任务类"""
@@ -27,10 +34,43 @@ class OCRTask:
         self.id = OCRTask._id_counter
 
 
+class OCREngineScheduler:
+    """OCR引擎调度器：多个任务可以同时解码视频，但同一时间只有一个任务使用OCR引擎"""
+
+    def __init__(self, slots=1):
+        self.slots = slots
+        self.holders = []
+        self.waiting = deque()
+
+    def request(self, process):
+        """任务请求使用OCR引擎，空闲时立即授予，否则排队"""
+        if process in self.holders or process in self.waiting:
+            return
+        self.waiting.append(process)
+        self._dispatch()
+
+    def release(self, process):
+        """任务释放OCR引擎（或放弃排队）"""
+        if process in self.holders:
+            self.holders.remove(process)
+        if process in self.waiting:
+            self.waiting.remove(process)
+        self._dispatch()
+
+    def _dispatch(self):
+        while self.waiting and len(self.holders) < self.slots:
+            process = self.waiting.popleft()
+            self.holders.append(process)
+            process.grantResource("ocr")
+
+
+ocr_engine_scheduler = OCREngineScheduler()
+
+
 class OCRProcess(QObject):
     """OCR处理进程"""
 
-    progress_signal = Signal(int, int, int)  # 进度百分比, 当前帧, 总帧数
+    progress_signal = Signal(int, str, str)  # 进度百分比, 速度, 状态信息
     finished_signal = Signal(bool, str)  # 成功/失败, 消息
     log_signal = Signal(str, bool, bool)  # 日志信息
     print_signal = Signal(str)  # 捕获print输出
@@ -45,6 +85,16 @@ class OCRProcess(QObject):
         self.output_lines = []  # 存储输出用于错误诊断
         self._cancellation_timer = None
 
+        # 结构化进度通道
+        self.progress_server = None
+        self.progress_socket = None
+        self._progress_buffer = b""
+        self._latest_progress = None
+        self._progress_stopping = False  # 关闭进度通道后不再处理OCR引擎请求
+        self._progress_timer = QTimer(self)
+        self._progress_timer.setInterval(PROGRESS_REFRESH_INTERVAL)
+        self._progress_timer.timeout.connect(self._flushProgress)
+
     def build_ocr_command(self):
         """根据配置构建 ocr 命令"""
         args = self.task.args
@@ -77,6 +127,8 @@ class OCRProcess(QObject):
         cmd_args.extend(
             ["--min_subtitle_duration", str(args["min_subtitle_duration_sec"])]
         )
+        if args.get("memory_limit_mb"):
+            cmd_args.extend(["--memory_limit_mb", str(args["memory_limit_mb"])])
 
         # 处理paddleocr_path参数
         if "paddleocr_path" in args and args["paddleocr_path"]:
@@ -101,6 +153,12 @@ class OCRProcess(QObject):
             cmd_args.extend(["--crop_width2", str(args["--crop_width2"])])
             cmd_args.extend(["--crop_height2", str(args["--crop_height2"])])
 
+        # 结构化进度通道
+        if self.progress_server:
+            cmd_args.extend(
+                ["--progress_socket", self.progress_server.fullServerName()]
+            )
+
         return cmd_path, cmd_args
 
     def start(self):
@@ -108,11 +166,14 @@ class OCRProcess(QObject):
         self.task.status = "提取中"
 
         try:
+            self._startProgressServer()
+
             # 获取videocr-cli.exe路径
             cmd_path, cmd_args = self.build_ocr_command()
 
             if not os.path.exists(cmd_path):
                 error_msg = f"videocr-cli.exe不存在: {cmd_path}"
+                self._stopProgressServer()
                 self.task.status = "失败"
                 self.task.error_message = error_msg
                 self.finished_signal.emit(False, error_msg)
@@ -143,6 +204,7 @@ class OCRProcess(QObject):
             self.process.start()
 
         except Exception as e:
+            self._stopProgressServer()
             if not self.is_cancelled:
                 error_msg = f"OCR处理失败: {str(e)}"
                 print(error_msg)
@@ -154,6 +216,112 @@ class OCRProcess(QObject):
                     f"OCR处理失败: -{self.task.input_file}- 错误信息: {str(e)}"
                 )
 
+    def _startProgressServer(self):
+        """启动本地进度服务，CLI 通过它发送 JSON 行格式的进度"""
+        server = QLocalServer(self)
+        name = f"videocr-progress-{os.getpid()}-{self.task.id}-{uuid.uuid4().hex[:8]}"
+        if not server.listen(name):
+            self.logger.warning(f"进度通道启动失败: {server.errorString()}")
+            return
+
+        server.newConnection.connect(self._onProgressConnection)
+        self.progress_server = server
+        self._progress_stopping = False
+        self._progress_timer.start()
+
+    def _onProgressConnection(self):
+        """CLI 连接到进度通道"""
+        socket = self.progress_server.nextPendingConnection()
+        if socket is None:
+            return
+        self.progress_socket = socket
+        socket.readyRead.connect(self._readProgress)
+
+    def _readProgress(self):
+        """读取进度数据，只保留最新一条，由定时器统一刷新"""
+        self._progress_buffer += self.progress_socket.readAll().data()
+        *lines, self._progress_buffer = self._progress_buffer.split(b"\n")
+        for line in lines:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+
+            if message.get("request") == "ocr":
+                if self._progress_stopping:
+                    # 进程已结束，残留在缓冲区中的请求不能再占用或排队OCR引擎
+                    continue
+                self.log_signal.emit("等待OCR引擎空闲…", False, False)
+                ocr_engine_scheduler.request(self)
+            elif message.get("release") == "ocr":
+                ocr_engine_scheduler.release(self)
+            else:
+                self._latest_progress = message
+
+    def grantResource(self, resource):
+        """通知CLI可以使用共享资源"""
+        if self.progress_socket is None or self._progress_stopping:
+            return
+        self.progress_socket.write(
+            (json.dumps({"grant": resource}) + "\n").encode("utf-8")
+        )
+        self.progress_socket.flush()
+
+    def _flushProgress(self):
+        """按固定频率把最新进度发送给界面"""
+        update = self._latest_progress
+        if update is None:
+            return
+        self._latest_progress = None
+
+        stage = update.get("stage")
+        current = update.get("current", 0)
+        total = update.get("total", 0)
+        ratio = min(current / total, 1.0) if total > 0 else 0.0
+        eta = update.get("eta")
+        eta_text = f" | 剩余 {self._format_seconds(eta)}" if eta is not None else ""
+
+        if stage == "decode":
+            progress = ratio * 50
+            speed = f"{update.get('fps', 0):.1f} fps"
+            current_text = self._format_seconds(current / 1000)
+            total_text = self._format_seconds(total / 1000)
+            message = (
+                f"步骤1/2: 正在处理图像中… {current_text} / {total_text}"
+                f" | {speed}{eta_text}"
+            )
+        elif stage == "ocr":
+            progress = 50 + ratio * 50
+            speed = f"{int(current)}/{int(total)}"
+            message = f"步骤2/2: 正在对图像进行OCR {speed}{eta_text}"
+        else:
+            return
+
+        self.task.progress = progress
+        self.progress_signal.emit(int(progress), speed, message)
+        self.log_signal.emit(message, False, True)
+
+    def _stopProgressServer(self):
+        """关闭进度通道"""
+        self._progress_timer.stop()
+        self._progress_stopping = True
+        if self.progress_socket:
+            # 先读完缓冲区中剩余的进度，再释放OCR引擎，避免残留请求重新占用
+            self._readProgress()
+            self._flushProgress()
+            self.progress_socket.readyRead.disconnect(self._readProgress)
+            self.progress_socket.abort()
+            self.progress_socket = None
+        if self.progress_server:
+            self.progress_server.close()
+            self.progress_server = None
+        ocr_engine_scheduler.release(self)
+
+    @staticmethod
+    def _format_seconds(seconds):
+        seconds = int(seconds)
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
     def handle_stdout(self):
         """处理标准输出"""
         if not self.process:
@@ -162,7 +330,7 @@ class OCRProcess(QObject):
         data = (
             self.process.readAllStandardOutput().data().decode("utf-8", errors="ignore")
         )
-        lines = data.split("\n")
+        lines = data.replace("\r", "\n").split("\n")
 
         for line in lines:
             line = line.strip()
@@ -196,6 +364,8 @@ class OCRProcess(QObject):
 
     def handle_finished(self, exit_code, exit_status):
         """进程完成处理"""
+        self._stopProgressServer()
+
         if self.is_cancelled:
             self.task.status = "已取消"
             self.finished_signal.emit(False, "OCR处理已取消")
@@ -250,6 +420,7 @@ class OCRProcess(QObject):
         }
 
         error_msg = error_map.get(error, f"进程错误: {error}")
+        self._stopProgressServer()
         self.finished_signal.emit(False, error_msg)
 
     def cancel(self):
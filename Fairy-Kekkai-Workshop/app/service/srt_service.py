@@ -1,31 +1,748 @@
-import srt
+import difflib
+import functools
+import io
+import os
+import re
+from array import array
+from collections import defaultdict
+
+import numpy as np
+
+from .CLI.videocr.timecode import (
+    format_time_range,
+    ms_to_ass_timestamp,
+    ms_to_ass_timestamps,
+    ms_to_timestamps,
+    parse_time_range,
+    timestamp_to_ms,
+)
+
+# 字幕块开头：空行之后是「序号 + 时间轴」或直接是时间轴，缺少空行时须是「序号 + 时间轴」，
+# 其余的空行属于上一条字幕的文本，与 srt 库的解析结果一致
+CUE_START_PATTERN = re.compile(
+    rb"\n(?:\r?\n\s*(?=(?:\d+[ \t]*\r?\n)?[^\r\n]*-->)"
+    rb"|(?=\d+[ \t]*\r?\n[^\r\n]*-->))"
+)
+UTF8_BOM = b"\xef\xbb\xbf"
+
+# 双语合并：两条字幕至少重叠这么久（较短的字幕则是其时长的一半）才视为同一句
+MERGE_MIN_OVERLAP_MS = 200
+
+# 项目文件夹中的 ASS 样式模板，各集转换和压制时共用
+PROJECT_STYLE_FILE = "样式.ass"
+# ASS 事件文本中的特效标签，如 {\\an8}
+ASS_OVERRIDE_PATTERN = re.compile(r"\{[^}]*\}")
+ASS_DEFAULT_SCRIPT_INFO = {
+    "ScriptType": "v4.00+",
+    "WrapStyle": "0",
+    "ScaledBorderAndShadow": "yes",
+    "PlayResX": "1920",
+    "PlayResY": "1080",
+}
+# 单语字幕使用的样式名；双语字幕中译文、原文使用的样式名
+ASS_DEFAULT_STYLE_NAME = "Default"
+ASS_TRANSLATED_STYLE_NAME = "Translated"
+ASS_ORIGINAL_STYLE_NAME = "Original"
+
+# [V4+ Styles] 的字段顺序
+ASS_STYLE_FORMAT = (
+    "Name",
+    "Fontname",
+    "Fontsize",
+    "PrimaryColour",
+    "SecondaryColour",
+    "OutlineColour",
+    "BackColour",
+    "Bold",
+    "Italic",
+    "Underline",
+    "StrikeOut",
+    "ScaleX",
+    "ScaleY",
+    "Spacing",
+    "Angle",
+    "BorderStyle",
+    "Outline",
+    "Shadow",
+    "Alignment",
+    "MarginL",
+    "MarginR",
+    "MarginV",
+    "Encoding",
+)
+ASS_DEFAULT_STYLE = {
+    "Fontname": "Microsoft YaHei",
+    "Fontsize": "60",
+    "PrimaryColour": "&H00FFFFFF",
+    "SecondaryColour": "&H000000FF",
+    "OutlineColour": "&H00000000",
+    "BackColour": "&H80000000",
+    "Bold": "0",
+    "Italic": "0",
+    "Underline": "0",
+    "StrikeOut": "0",
+    "ScaleX": "100",
+    "ScaleY": "100",
+    "Spacing": "0",
+    "Angle": "0",
+    "BorderStyle": "1",
+    "Outline": "3",
+    "Shadow": "0",
+    "Alignment": "2",
+    "MarginL": "30",
+    "MarginR": "30",
+    "MarginV": "30",
+    "Encoding": "1",
+}
+
+
+class Cue:
+    """单条字幕，时间为整数毫秒，文本在首次访问时才解码"""
+
+    __slots__ = ("index", "start", "end", "_text")
+
+    def __init__(self, index, start, end, text):
+        self.index = index
+        self.start = start
+        self.end = end
+        self._text = text
+
+    @property
+    def text(self):
+        if isinstance(self._text, bytes):
+            self._text = (
+                self._text.decode("utf-8", errors="replace").replace("\r", "").strip()
+            )
+        return self._text
+
+    @property
+    def timeline(self):
+        return format_time_range(self.start, self.end)
+
+    def __repr__(self):
+        return f"Cue({self.index}, {self.timeline!r}, {self.text!r})"
+
+
+class SrtReader:
+    """流式读取 SRT 文件
+
+    打开时分块扫描一遍，只记录每条字幕在文件中的字节偏移（每条 8 字节）；
+    遍历时按偏移逐条切出，按下标访问时直接定位，不把整个文件读入内存
+    """
+
+    CHUNK_SIZE = 1 << 20
+    # 判断字幕块开头时向后查看的最大字节数（序号行加时间轴行）
+    LOOKAHEAD = 4096
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._offsets = array("q")
+        self._scan()
+
+    def _scan(self):
+        with open(self.file_path, "rb") as f:
+            data = f.read(self.CHUNK_SIZE)
+            bom = len(UTF8_BOM) if data.startswith(UTF8_BOM) else 0
+            # 开头补一个空行，文件第一条字幕与其他字幕按同样的规则匹配
+            buffer = b"\n\n" + data[bom:]
+            base = bom - 2
+            while True:
+                more = f.read(self.CHUNK_SIZE)
+                buffer += more
+                limit = len(buffer) - (self.LOOKAHEAD if more else 0)
+                consumed = 0
+                for match in CUE_START_PATTERN.finditer(buffer):
+                    if match.start() >= limit:
+                        break
+                    self._offsets.append(base + match.end())
+                    consumed = match.end()
+                if not more:
+                    break
+                cut = max(consumed, limit)
+                buffer = buffer[cut:]
+                base += cut
+
+    @staticmethod
+    def _parse_block(data, position):
+        """解析字幕块，缺少序号时按位置编号，时间轴无法解析时返回 None"""
+        parts = data.split(b"\n", 2)
+        if b"-->" in parts[0]:
+            index, timeline = position + 1, parts[0]
+            text = data[len(parts[0]) + 1 :]
+        else:
+            try:
+                index = int(parts[0])
+            except ValueError:
+                index = position + 1
+            timeline = parts[1]
+            text = parts[2] if len(parts) > 2 else b""
+        timing = parse_time_range(timeline)
+        if timing is None:
+            return None
+        return Cue(index, timing[0], timing[1], text)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __iter__(self):
+        count = len(self._offsets)
+        if not count:
+            return
+        with open(self.file_path, "rb") as f:
+            # buffer 对应文件中从 base 开始的内容
+            buffer = b""
+            base = self._offsets[0]
+            f.seek(base)
+            for position, start in enumerate(self._offsets):
+                if position + 1 < count:
+                    end = self._offsets[position + 1]
+                    while base + len(buffer) < end:
+                        buffer = buffer[start - base :] + f.read(self.CHUNK_SIZE)
+                        base = start
+                    block = buffer[start - base : end - base]
+                else:
+                    block = buffer[start - base :] + f.read()
+                cue = self._parse_block(block, position)
+                if cue is not None:
+                    yield cue
+
+    def __getitem__(self, position):
+        """按下标读取第 position 条字幕，时间轴无法解析时返回 None"""
+        if position < 0:
+            position += len(self._offsets)
+        start = self._offsets[position]
+        with open(self.file_path, "rb") as f:
+            f.seek(start)
+            if position + 1 < len(self._offsets):
+                block = f.read(self._offsets[position + 1] - start)
+            else:
+                block = f.read()
+        return self._parse_block(block, position)
+
+
+class _SubtitleWriter:
+    def __init__(self, output):
+        """output 为文件路径或已打开的文本文件对象"""
+        self._owns_file = isinstance(output, (str, bytes)) or hasattr(
+            output, "__fspath__"
+        )
+        self._file = open(output, "w", encoding="utf-8") if self._owns_file else output
+        self.count = 0
+
+    def close(self):
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SrtWriter(_SubtitleWriter):
+    """流式写出 SRT，逐条写入，序号自动递增"""
+
+    def write_block(self, timeline, text):
+        """写入一条字幕，timeline 为已格式化的时间轴"""
+        self.count += 1
+        self._file.write(f"{self.count}\n{timeline}\n{text}\n\n")
+
+    def write(self, start, end, text):
+        """写入一条字幕，start、end 为毫秒"""
+        self.write_block(format_time_range(start, end), text)
+
+
+class AssStyle:
+    """ASS 样式，未指定的字段使用 ASS_DEFAULT_STYLE"""
+
+    __slots__ = ("name", "fields")
+
+    def __init__(self, name=ASS_DEFAULT_STYLE_NAME, **fields):
+        self.name = name
+        self.fields = {**ASS_DEFAULT_STYLE, **{k: str(v) for k, v in fields.items()}}
+
+    @classmethod
+    def from_line(cls, line, format_fields=ASS_STYLE_FORMAT):
+        """解析「Style: 」行，字段顺序由样式区的 Format 行决定，最后一个字段可含逗号"""
+        values = line.split(":", 1)[1].strip().split(",", len(format_fields) - 1)
+        fields = {key: value.strip() for key, value in zip(format_fields, values)}
+        name = fields.pop("Name", ASS_DEFAULT_STYLE_NAME)
+        # SSA 的 [V4 Styles] 没有的字段使用默认值，多出的字段忽略
+        return cls(name, **{k: v for k, v in fields.items() if k in ASS_DEFAULT_STYLE})
+
+    def to_line(self):
+        values = [self.name, *(self.fields[key] for key in ASS_STYLE_FORMAT[1:])]
+        return "Style: " + ",".join(values)
+
+    def __repr__(self):
+        return f"AssStyle({self.name!r})"
+
+
+# 默认样式：单语字幕使用 Default，双语字幕译文在上、字号较大，原文在下
+DEFAULT_ASS_STYLES = (
+    AssStyle(ASS_DEFAULT_STYLE_NAME),
+    AssStyle(ASS_TRANSLATED_STYLE_NAME, Fontsize=64, MarginV=80),
+    AssStyle(
+        ASS_ORIGINAL_STYLE_NAME, Fontsize=44, PrimaryColour="&H00E6E6E6", MarginV=30
+    ),
+)
+
+
+class AssTemplate:
+    """ASS 样式模板：[Script Info] 与各样式，同一项目的各集共用"""
+
+    __slots__ = ("script_info", "styles")
+
+    def __init__(self, script_info=None, styles=DEFAULT_ASS_STYLES):
+        self.script_info = {**ASS_DEFAULT_SCRIPT_INFO, **(script_info or {})}
+        self.styles = {style.name: style for style in styles}
+
+    def style(self, name):
+        """取指定样式，模板中没有时使用同名的默认样式"""
+        if name in self.styles:
+            return self.styles[name]
+        for style in DEFAULT_ASS_STYLES:
+            if style.name == name:
+                return style
+        return AssStyle(name)
+
+    def with_styles(self, *names):
+        """保证模板包含这些样式，返回 (样式列表, 各样式名)"""
+        styles = dict(self.styles)
+        for name in names:
+            styles.setdefault(name, self.style(name))
+        return list(styles.values()), names
+
+
+def load_ass_template(path):
+    """读取 ASS 文件中的样式作为模板，文件未修改时直接使用缓存的解析结果"""
+    stat = os.stat(path)
+    return _parse_ass_template(os.fspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_ass_template(path, mtime_ns, size):
+    reader = AssReader(path)
+    return AssTemplate(reader.script_info, reader.styles.values())
+
+
+def save_ass_template(path, template):
+    """把模板写为只有文件头和样式的 ASS 文件，可用 Aegisub 等工具编辑"""
+    AssWriter(path, template.styles.values(), template.script_info).close()
+
+
+def load_project_template(project_dir):
+    """项目的样式模板：项目文件夹中的 样式.ass，不存在时使用默认样式"""
+    path = os.path.join(project_dir, PROJECT_STYLE_FILE)
+    if os.path.exists(path):
+        return load_ass_template(path)
+    return AssTemplate()
+
+
+def ass_text(text):
+    """字幕文本转为 ASS 事件文本，换行写作 \\N"""
+    return text.replace("\r", "").replace("\n", "\\N")
+
+
+def plain_text(text):
+    """ASS 事件文本转为纯文本：去掉特效标签，\\N、\\n 转为换行，\\h 转为空格"""
+    text = ASS_OVERRIDE_PATTERN.sub("", text)
+    return text.replace("\\N", "\n").replace("\\n", "\n").replace("\\h", " ").strip()
+
+
+class AssReader:
+    """读取 ASS/SSA：打开时只解析文件头和样式，对话事件在迭代时逐行读取
+
+    迭代得到 Cue（纯文本，时间为毫秒），events() 得到包含样式和原始文本的事件
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.script_info = {}
+        self.styles = {}
+        self._events_offset = None
+        self._event_format = None
+        self._read_header()
+
+    def _read_header(self):
+        section = None
+        style_format = ASS_STYLE_FORMAT
+        with open(self.file_path, "r", encoding="utf-8-sig", errors="replace") as f:
+            for line in iter(f.readline, ""):
+                line = line.strip()
+                if line.startswith("[") and line.endswith("]"):
+                    section = line.lower()
+                    continue
+                if not line or line.startswith(";") or ":" not in line:
+                    continue
+                key, value = (part.strip() for part in line.split(":", 1))
+                if section == "[script info]":
+                    self.script_info[key] = value
+                elif section in ("[v4+ styles]", "[v4 styles]"):
+                    if key == "Format":
+                        style_format = tuple(k.strip() for k in value.split(","))
+                    elif key == "Style":
+                        style = AssStyle.from_line(line, style_format)
+                        self.styles[style.name] = style
+                elif section == "[events]" and key == "Format":
+                    self._event_format = [k.strip() for k in value.split(",")]
+                    self._events_offset = f.tell()
+                    break
+
+    def events(self):
+        """逐条读取对话事件，返回 (开始毫秒, 结束毫秒, 样式名, 原始文本)"""
+        if self._events_offset is None:
+            return
+        columns = self._event_format
+        start_col, end_col = columns.index("Start"), columns.index("End")
+        style_col = columns.index("Style") if "Style" in columns else None
+        with open(self.file_path, "r", encoding="utf-8-sig", errors="replace") as f:
+            f.seek(self._events_offset)
+            for line in f:
+                if line.startswith("["):
+                    break
+                if not line.startswith("Dialogue:"):
+                    continue
+                values = line[9:].strip().split(",", len(columns) - 1)
+                if len(values) < len(columns):
+                    continue
+                yield (
+                    timestamp_to_ms(values[start_col]),
+                    timestamp_to_ms(values[end_col]),
+                    values[style_col].strip() if style_col is not None else "",
+                    values[-1],
+                )
+
+    def __iter__(self):
+        for index, (start, end, _, text) in enumerate(self.events(), 1):
+            yield Cue(index, start, end, plain_text(text))
+
+
+class AssWriter(_SubtitleWriter):
+    """流式写出 ASS：先写文件头和样式，再逐条写入对话事件"""
+
+    def __init__(self, output, styles=DEFAULT_ASS_STYLES[:1], script_info=None):
+        super().__init__(output)
+        # 样式总是按 V4+ 格式写出，模板来自 SSA 文件时也要改写 ScriptType
+        info = {
+            **ASS_DEFAULT_SCRIPT_INFO,
+            **(script_info or {}),
+            "ScriptType": "v4.00+",
+        }
+        info_lines = "\n".join(f"{key}: {value}" for key, value in info.items())
+        style_lines = "\n".join(style.to_line() for style in styles)
+        self._file.write(
+            "[Script Info]\n"
+            f"{info_lines}\n\n"
+            "[V4+ Styles]\n"
+            f"Format: {', '.join(ASS_STYLE_FORMAT)}\n"
+            f"{style_lines}\n\n"
+            "[Events]\n"
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, "
+            "Effect, Text\n"
+        )
+
+    def write_event(self, start, end, text, style=ASS_DEFAULT_STYLE_NAME):
+        """写入一条对话，start、end 为已格式化的 ASS 时间戳"""
+        self.count += 1
+        self._file.write(
+            f"Dialogue: 0,{start},{end},{style},,0,0,0,,{ass_text(text)}\n"
+        )
+
+    def write(self, start, end, text, style=ASS_DEFAULT_STYLE_NAME):
+        """写入一条对话，start、end 为毫秒"""
+        self.write_event(
+            ms_to_ass_timestamp(start), ms_to_ass_timestamp(end), text, style
+        )
+
+
+def convert_srt_to_ass(srt_path, output_path, template=None, style=None):
+    """逐条读取 SRT 写为 ASS，样式与文件头取自模板，返回条数"""
+    template = template or AssTemplate()
+    styles, (style,) = template.with_styles(style or ASS_DEFAULT_STYLE_NAME)
+    with AssWriter(output_path, styles, template.script_info) as writer:
+        for cue in SrtReader(srt_path):
+            writer.write(cue.start, cue.end, cue.text, style)
+        return writer.count
+
+
+def align_cues(old, new):
+    """对齐修改前后的两份字幕，old、new 为 [(开始毫秒, 文本键)]，返回 {new 下标: old 下标}
+
+    先按文本做最长公共子序列匹配；剩下未对上的字幕（如顺序调整），
+    再与文本相同、开始时间最接近的旧字幕配对。文本有改动的字幕不会出现在结果中。
+    """
+    matcher = difflib.SequenceMatcher(
+        None, [key for _, key in old], [key for _, key in new], autojunk=False
+    )
+    matches = {}
+    for block in matcher.get_matching_blocks():
+        for k in range(block.size):
+            matches[block.b + k] = block.a + k
+
+    unmatched = defaultdict(list)
+    used = set(matches.values())
+    for i, (_, key) in enumerate(old):
+        if i not in used:
+            unmatched[key].append(i)
+    for j, (start, key) in enumerate(new):
+        candidates = unmatched.get(key)
+        if j in matches or not candidates:
+            continue
+        best = min(candidates, key=lambda i: abs(old[i][0] - start))
+        candidates.remove(best)
+        matches[j] = best
+    return matches
+
+
+def merge_tracks(original, translated, min_overlap_ms=MERGE_MIN_OVERLAP_MS):
+    """按时间重叠把原文、译文两条 SubtitleTrack 合并为双语字幕
+
+    两条轨的字幕按开始时间归并后扫描一遍，与当前分组重叠足够久的字幕并入该组，
+    因此一句原文对应多句译文（拆分）或多句原文对应一句译文（合并）时都会归为一条。
+    返回 (开始毫秒数组, 结束毫秒数组, 原文列表, 译文列表)，没有对应内容的一侧为空字符串
+    """
+    starts = np.concatenate((original.starts, translated.starts))
+    ends = np.concatenate((original.ends, translated.ends))
+    sources = np.concatenate(
+        (
+            np.zeros(len(original), dtype=np.int8),
+            np.ones(len(translated), dtype=np.int8),
+        )
+    )
+    texts = np.concatenate((original.texts, translated.texts))
+    if not len(starts):
+        return starts, ends, [], []
+
+    order = np.lexsort((sources, starts))
+    starts, ends, sources, texts = (
+        starts[order],
+        ends[order],
+        sources[order],
+        texts[order],
+    )
+    # 按开始时间排序后，之前所有字幕的最晚结束时间就是当前分组的结束时间
+    reach = np.maximum.accumulate(ends)
+    required = np.maximum(np.minimum(min_overlap_ms, (ends - starts) // 2), 1)
+    new_group = np.empty(len(starts), dtype=bool)
+    new_group[0] = True
+    new_group[1:] = reach[:-1] - starts[1:] < required[1:]
+
+    heads = np.flatnonzero(new_group)
+    group_ids = np.cumsum(new_group) - 1
+    parts = ([[] for _ in heads], [[] for _ in heads])
+    for group, source, text in zip(group_ids.tolist(), sources.tolist(), texts):
+        parts[source][group].append(text)
+    return (
+        starts[heads],
+        np.maximum.reduceat(ends, heads),
+        [" ".join(group) for group in parts[0]],
+        [" ".join(group) for group in parts[1]],
+    )
+
+
+def write_bilingual_srt(merged, output, translated_first=True):
+    """把 merge_tracks 的结果写为双语 SRT，每条字幕上下两行"""
+    starts, ends, originals, translations = merged
+    with SrtWriter(output) as writer:
+        for start, end, original, translation in zip(
+            ms_to_timestamps(starts), ms_to_timestamps(ends), originals, translations
+        ):
+            lines = (
+                [translation, original] if translated_first else [original, translation]
+            )
+            writer.write_block(f"{start} --> {end}", "\n".join(filter(None, lines)))
+
+
+def write_bilingual_ass(merged, output, template=None):
+    """把 merge_tracks 的结果写为双语 ASS，译文、原文分别使用模板中的 Translated、Original 样式"""
+    starts, ends, originals, translations = merged
+    template = template or AssTemplate()
+    styles, (translated_style, original_style) = template.with_styles(
+        ASS_TRANSLATED_STYLE_NAME, ASS_ORIGINAL_STYLE_NAME
+    )
+    with AssWriter(output, styles, template.script_info) as writer:
+        for start, end, original, translation in zip(
+            ms_to_ass_timestamps(starts),
+            ms_to_ass_timestamps(ends),
+            originals,
+            translations,
+        ):
+            if translation:
+                writer.write_event(start, end, translation, translated_style)
+            if original:
+                writer.write_event(start, end, original, original_style)
+
+
+def build_bilingual_subtitle(
+    original_path, translated_path, output_path, template=None
+):
+    """读取原文、译文 SRT 生成双语字幕，按 output_path 的扩展名写为 .srt 或 .ass，返回条数"""
+    merged = merge_tracks(
+        SubtitleTrack.from_srt(original_path), SubtitleTrack.from_srt(translated_path)
+    )
+    if str(output_path).lower().endswith(".ass"):
+        write_bilingual_ass(merged, output_path, template)
+    else:
+        write_bilingual_srt(merged, output_path)
+    return len(merged[0])
+
+
+class SubtitleTrack:
+    """内存中的字幕轨：开始、结束时间为 int64 毫秒数组，文本单独存放
+
+    调整时间的操作对整个数组一次完成，原地修改并返回自身，可以链式调用
+    """
+
+    def __init__(self, starts=(), ends=(), texts=()):
+        self.starts = np.array(starts, dtype=np.int64)
+        self.ends = np.array(ends, dtype=np.int64)
+        self.texts = np.empty(len(texts), dtype=object)
+        self.texts[:] = list(texts)
+        if not len(self.starts) == len(self.ends) == len(self.texts):
+            raise ValueError("开始时间、结束时间与文本的数量不一致")
+
+    @classmethod
+    def from_cues(cls, cues):
+        starts = array("q")
+        ends = array("q")
+        texts = []
+        for cue in cues:
+            starts.append(cue.start)
+            ends.append(cue.end)
+            texts.append(cue.text)
+        return cls(starts, ends, texts)
+
+    @classmethod
+    def from_srt(cls, file_path):
+        return cls.from_cues(SrtReader(file_path))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        for i, (start, end, text) in enumerate(
+            zip(self.starts.tolist(), self.ends.tolist(), self.texts), 1
+        ):
+            yield Cue(i, start, end, text)
+
+    def _select(self, mask):
+        self.starts = self.starts[mask]
+        self.ends = self.ends[mask]
+        self.texts = self.texts[mask]
+
+    def sort(self):
+        """按开始时间排序，开始时间相同时保持原顺序"""
+        order = np.argsort(self.starts, kind="stable")
+        self._select(order)
+        return self
+
+    def shift(self, offset_ms):
+        """整体平移，offset_ms 为负时提前"""
+        self.starts += offset_ms
+        self.ends += offset_ms
+        return self
+
+    def scale(self, factor, origin_ms=0):
+        """以 origin_ms 为原点按比例缩放时间"""
+        for times in (self.starts, self.ends):
+            times[:] = np.rint((times - origin_ms) * factor) + origin_ms
+        return self
+
+    def convert_framerate(self, source_fps, target_fps):
+        """帧率转换，如 23.976 的字幕用于加速到 25 帧的视频"""
+        return self.scale(source_fps / target_fps)
+
+    def clamp(self, minimum_ms=0, maximum_ms=None):
+        """把时间限制在区间内，完全落在区间外的字幕会被删除"""
+        np.clip(self.starts, minimum_ms, maximum_ms, out=self.starts)
+        np.clip(self.ends, minimum_ms, maximum_ms, out=self.ends)
+        self._select(self.ends > self.starts)
+        return self
+
+    def merge_overlaps(self, max_gap_ms=0):
+        """合并文本相同且重叠（或间隔不超过 max_gap_ms）的相邻字幕，常见于 OCR 重复识别"""
+        if len(self) < 2:
+            return self
+        self.sort()
+        same = (self.texts[1:] == self.texts[:-1]) & (
+            self.starts[1:] <= self.ends[:-1] + max_gap_ms
+        )
+        heads = np.flatnonzero(np.concatenate(([True], ~same)))
+        ends = np.maximum.reduceat(self.ends, heads)
+        self._select(heads)
+        self.ends = ends
+        return self
+
+    def trim_overlaps(self):
+        """前一条字幕的结束时间超过后一条的开始时间时，截断到后一条开始处
+
+        开始时间相同的字幕（如同时显示的上下两行）不截断
+        """
+        if len(self) < 2:
+            return self
+        self.sort()
+        later = self.starts[1:] > self.starts[:-1]
+        self.ends[:-1] = np.where(
+            later, np.minimum(self.ends[:-1], self.starts[1:]), self.ends[:-1]
+        )
+        return self
+
+    def fill_gaps(self, max_gap_ms):
+        """相邻字幕间隔不超过 max_gap_ms 时，延长前一条到后一条开始，避免字幕闪烁"""
+        if len(self) < 2:
+            return self
+        gaps = self.starts[1:] - self.ends[:-1]
+        mask = (gaps > 0) & (gaps <= max_gap_ms)
+        self.ends[:-1][mask] = self.starts[1:][mask]
+        return self
+
+    def write_srt(self, output):
+        """写出为 SRT，output 为文件路径或已打开的文本文件对象"""
+        # 时间戳整列一次格式化
+        starts = ms_to_timestamps(self.starts)
+        ends = ms_to_timestamps(self.ends)
+        with SrtWriter(output) as writer:
+            for start, end, text in zip(starts, ends, self.texts):
+                writer.write_block(f"{start} --> {end}", text)
 
 
 class Srt:
     def __init__(self, file_path):
         self.file_path = file_path
-        self.subtitle_data = []
-        self.timeline = []
-        self.subtitles = []
-        self.raw_content = ""  # 存储原始文件内容
-        self.parse_srt_file(file_path)  # 直接填充三个列表
+        self.reader = SrtReader(file_path)
+
+    @property
+    def raw_content(self):
+        """原始文件内容，只在需要时读取"""
+        with open(self.file_path, "r", encoding="utf-8-sig") as f:
+            return f.read()
 
-    def parse_srt_file(self, file_path):
-        """解析SRT文件并返回标准格式数据"""
-        with open(file_path, "r", encoding="utf-8") as f:
-            self.raw_content = f.read()  # 存储原始内容
-            subtitles = srt.parse(self.raw_content)
+    @property
+    def subtitle_data(self):
+        """[(序号, 时间轴, 文本)]"""
+        return [(cue.index, cue.timeline, cue.text) for cue in self.reader]
 
-        # 一次遍历同时填充三个列表
-        for sub in subtitles:
-            timeline_str = f"{sub.start} --> {sub.end}".replace(".", ",")
-            content = sub.content.strip()
+    @property
+    def timeline(self):
+        return [cue.timeline for cue in self.reader]
 
-            self.subtitle_data.append((sub.index, timeline_str, content))
-            self.timeline.append(timeline_str)
-            self.subtitles.append(content.replace("\n", " "))
+    @property
+    def subtitles(self):
+        return [cue.text.replace("\n", " ") for cue in self.reader]
 
-        return self.subtitles
+    def __len__(self):
+        return len(self.reader)
+
+    def __iter__(self):
+        return iter(self.reader)
+
+    def __getitem__(self, position):
+        return self.reader[position]
+
+    def to_track(self):
+        return SubtitleTrack.from_cues(self.reader)
 
     @staticmethod
     def create_from_lists(dialogues, timestamps, output_file=None):
@@ -40,41 +757,15 @@ class Srt:
         Returns:
             str: SRT格式的字符串
         """
-
-        def format_timestamp(ts):
-            """格式化时间戳为SRT标准格式"""
-            # 移除微秒部分，只保留毫秒（3位）
-            if "," in ts:
-                parts = ts.split(",")
-                if len(parts) == 2:
-                    milliseconds = parts[1][:3]  # 只取前3位毫秒
-                    return f"{parts[0]},{milliseconds}"
-            return ts
-
-        def parse_timestamp_range(ts_range):
-            """解析时间戳范围并格式化"""
-            if " --> " in ts_range:
-                start, end = ts_range.split(" --> ")
-                return f"{format_timestamp(start)} --> {format_timestamp(end)}"
-            return ts_range
-
-        srt_content = []
-
-        for i, (dialogue, timestamp) in enumerate(zip(dialogues, timestamps), 1):
-            # 序号
-            srt_content.append(str(i))
-
-            # 时间戳
-            formatted_timestamp = parse_timestamp_range(timestamp)
-            srt_content.append(formatted_timestamp)
-
-            # 对话内容
-            srt_content.append(dialogue)
-
-            # 空行
-            srt_content.append("")
-
-        srt_text = "\n".join(srt_content)
+        buffer = io.StringIO()
+        writer = SrtWriter(buffer)
+        for dialogue, timestamp in zip(dialogues, timestamps):
+            timing = parse_time_range(timestamp)
+            if timing:
+                writer.write(timing[0], timing[1], dialogue)
+            else:
+                writer.write_block(timestamp, dialogue)
+        srt_text = buffer.getvalue()
 
         # 如果需要保存文件
         if output_file:
@@ -101,5 +792,5 @@ class Srt:
 if __name__ == "__main__":
     srt_file = r"D:\Touhou-project\projects\名为喜欢的这份心情终将抵达之所\13\原文.srt"
     srt_obj = Srt(srt_file)
-    for i in srt_obj.raw_content.split("\n\n"):
-        print(i + "\n\n")
+    for cue in srt_obj:
+        print(f"{cue.index}\n{cue.timeline}\n{cue.text}\n\n")
@@ -0,0 +1,138 @@
+# coding:utf-8
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from ..common.setting import DB_PATH
+
+
+@dataclass
+class BatchMetrics:
+    """单次翻译请求的用量与耗时"""
+
+    model: str
+    cues: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # 服务商没有返回 usage 时 token 数为本地估算
+    estimated: bool = True
+    first_chunk_ms: float = None
+    duration_ms: float = 0.0
+    chunks: int = 0
+    success: bool = False
+
+    @property
+    def chunks_per_sec(self) -> float:
+        if self.duration_ms <= 0:
+            return 0.0
+        return self.chunks * 1000 / self.duration_ms
+
+
+def summarize_batches(batches) -> str:
+    """汇总一个任务的所有请求，用于任务卡片显示"""
+    done = [m for m in batches if m.success]
+    if not done:
+        return ""
+    prompt_tokens = sum(m.prompt_tokens for m in done)
+    completion_tokens = sum(m.completion_tokens for m in done)
+    first_chunks = [m.first_chunk_ms for m in done if m.first_chunk_ms is not None]
+    duration_ms = sum(m.duration_ms for m in done)
+    chunks = sum(m.chunks for m in done)
+
+    parts = [
+        f"{len(done)} 次请求",
+        f"输入 {prompt_tokens} / 输出 {completion_tokens} tokens"
+        + ("（含估算）" if any(m.estimated for m in done) else ""),
+    ]
+    if first_chunks:
+        parts.append(f"首字 {sum(first_chunks) / len(first_chunks) / 1000:.1f}s")
+    if duration_ms > 0:
+        parts.append(f"{chunks * 1000 / duration_ms:.1f} 块/秒")
+    if failed := len(batches) - len(done):
+        parts.append(f"失败 {failed} 次")
+    return " · ".join(parts)
+
+
+class TranslateMetricsStore:
+    """翻译请求的用量与耗时记录，用于比较各模型的速度与消耗"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS translate_metrics (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    input_file TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    cues INTEGER NOT NULL,
+                    prompt_tokens INTEGER NOT NULL,
+                    completion_tokens INTEGER NOT NULL,
+                    estimated INTEGER NOT NULL,
+                    first_chunk_ms REAL,
+                    duration_ms REAL NOT NULL,
+                    chunks INTEGER NOT NULL,
+                    success INTEGER NOT NULL,
+                    created_at INTEGER NOT NULL
+                )
+                """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, input_file: str, metrics: BatchMetrics):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO translate_metrics
+                    (input_file, model, cues, prompt_tokens, completion_tokens,
+                     estimated, first_chunk_ms, duration_ms, chunks, success, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    input_file,
+                    metrics.model,
+                    metrics.cues,
+                    metrics.prompt_tokens,
+                    metrics.completion_tokens,
+                    int(metrics.estimated),
+                    metrics.first_chunk_ms,
+                    metrics.duration_ms,
+                    metrics.chunks,
+                    int(metrics.success),
+                    int(time.time()),
+                ),
+            )
+
+    def model_summary(self, days=30):
+        """按模型汇总最近的请求：[(模型, 请求数, 平均首字毫秒, 块/秒, 每条字幕输出 tokens, 失败率)]"""
+        since = int(time.time()) - days * 86400
+        with self._lock, self._connect() as conn:
+            return conn.execute(
+                """
+                SELECT model,
+                    COUNT(*),
+                    AVG(CASE WHEN success THEN first_chunk_ms END),
+                    SUM(CASE WHEN success THEN chunks END) * 1000.0
+                        / NULLIF(SUM(CASE WHEN success THEN duration_ms END), 0),
+                    SUM(CASE WHEN success THEN completion_tokens END) * 1.0
+                        / NULLIF(SUM(CASE WHEN success THEN cues END), 0),
+                    1.0 - AVG(success)
+                FROM translate_metrics
+                WHERE created_at >= ?
+                GROUP BY model
+                ORDER BY COUNT(*) DESC
+                """,
+                (since,),
+            ).fetchall()
@@ -1,11 +1,23 @@
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import random
 import re
+import sqlite3
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import aclosing
 from dataclasses import dataclass
-from typing import Generator
+from email.utils import parsedate_to_datetime
+from typing import AsyncGenerator
 from urllib.parse import urlparse
 
-from openai import OpenAI
-from PySide6.QtCore import QThread, Signal
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI
+from PySide6.QtCore import QMetaObject, QObject, Qt, Signal, Slot
 from sparkai.llm.llm import (
     ChatSparkLLM,
     ChunkPrintHandler,
@@ -14,16 +26,197 @@ from sparkai.llm.llm import (
 from ..common.config import cfg
 from ..common.event_bus import event_bus
 from ..common.logger import Logger
-from ..common.setting import AI_ERROR_MAP
-
-
-def remove_thinking_content(text: str) -> str:
-    # 匹配<think>和</think>
-    thinking_pattern = r"<think>.*?</think>"
+from ..common.setting import AI_ERROR_MAP, AI_model_dict
+from .CLI.videocr.timecode import parse_time_range
+from .srt_service import align_cues
+from .translate_metrics_service import (
+    BatchMetrics,
+    TranslateMetricsStore,
+    summarize_batches,
+)
+from .translation_memory_service import (
+    TranslationMemory,
+    hash_prompt,
+    normalize_source,
+)
 
-    cleaned_text = re.sub(thinking_pattern, "", text, flags=re.DOTALL).strip()
+# 每次请求的最大字幕条数，条数过多时模型容易漏译或合并字幕
+MAX_BATCH_CUES = 100
+# 每个批次附带的上文字幕条数，仅作参考，保持前后批次译名和语气一致
+CONTEXT_CUES = 3
+# 夹在待翻译内容之间、少于该条数的翻译记忆命中会随批次重新翻译
+MIN_MEMORY_RUN = 3
+
+# 结构化模式：字幕以「编号|文本」逐行收发，时间轴在本地重新拼接
+STRUCTURED_PROMPT_TEMPLATE = (
+    "请将以下{origin_lang}字幕翻译为{target_lang}。\n"
+    "每行一条字幕，格式为「编号|原文」，原文中的换行写作 \\n。\n"
+    "请按相同格式逐行输出「编号|译文」，编号保持不变，"
+    "不要合并、拆分或遗漏任何一条，也不要输出其他内容。\n"
+    "若文本中出现人名，优先参照《东方Project》官方或相关常见译名进行匹配与统一。\n"
+    "如因 OCR 识别错误导致语句无法理解或无法翻译，请将该句译文替换为 ***\n"
+    "待翻译内容：\n{content}"
+)
+# 项目批量翻译前统一确定术语译名
+GLOSSARY_PROMPT_TEMPLATE = (
+    "请将以下{origin_lang}人名与专有名词翻译为{target_lang}，每行一个。\n"
+    "请逐行输出「原文|译文」，不要遗漏任何一个，也不要输出其他内容。\n"
+    "若为《东方Project》中的人名或名词，优先使用官方或相关常见译名。\n"
+    "待翻译内容：\n{content}"
+)
+GLOSSARY_RECORD_PATTERN = re.compile(r"^\s*(.+?)\s*[|｜]\s*(.+?)\s*$")
+STRUCTURED_RECORD_PATTERN = re.compile(r"^\s*(\d+)\s*\|(.*)$")
+# 结构化模式下缺失编号的最多请求次数（含首次）
+STRUCTURED_MAX_ATTEMPTS = 3
+# 译文写入文件并通知界面的最短间隔
+OUTPUT_FLUSH_INTERVAL_SEC = 0.1
+
+# 断点续翻记录：与输出文件同名的 .progress.json
+MANIFEST_SUFFIX = ".progress.json"
+MANIFEST_VERSION = 1
+# 增量翻译：翻译完成时记下所用的原文，与输出文件同名的 .source.json
+SNAPSHOT_SUFFIX = ".source.json"
+SNAPSHOT_VERSION = 1
+
+# 批次失败重试：指数退避的基数与上限（秒）
+RETRY_BASE_DELAY_SEC = 2
+RETRY_MAX_DELAY_SEC = 60
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+# 额度、鉴权类错误重试也不会成功（部分服务商额度用尽时也返回 429）
+NON_RETRYABLE_KEYWORDS = (
+    "insufficient_quota",
+    "quota",
+    "balance",
+    "invalid_api_key",
+    "authentication",
+    "unauthorized",
+)
 
-    return cleaned_text
+CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uff00-\uffef]")
+
+
+class UnclosedThinkError(Exception):
+    """模型输出在思考块中结束（多为输出被截断），本批次没有得到译文，需要重试"""
+
+    def __init__(self):
+        super().__init__("模型输出在思考内容中结束，未返回译文")
+
+
+class ThinkFilter:
+    """流式过滤 <think>...</think> 思考内容，标签被拆到多个片段时也能识别
+
+    同时去掉开头和思考块之后的空白，末尾空白暂存到有后续内容时再输出
+    """
+
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._inside = False
+        self._strip_leading = True
+        self._held_whitespace = ""
+
+    def feed(self, text: str) -> str:
+        self._buffer += text
+        output = []
+        while self._buffer:
+            if self._inside:
+                end = self._buffer.find(self.CLOSE_TAG)
+                if end == -1:
+                    # 只保留可能是半个结束标签的尾部
+                    self._buffer = self._buffer[-(len(self.CLOSE_TAG) - 1) :]
+                    break
+                self._buffer = self._buffer[end + len(self.CLOSE_TAG) :]
+                self._inside = False
+                self._strip_leading = True
+                continue
+
+            start = self._buffer.find(self.OPEN_TAG)
+            if start != -1:
+                output.append(self._emit(self._buffer[:start]))
+                self._buffer = self._buffer[start + len(self.OPEN_TAG) :]
+                self._inside = True
+                continue
+
+            keep = self._partial_tag_length(self._buffer)
+            output.append(self._emit(self._buffer[: len(self._buffer) - keep]))
+            self._buffer = self._buffer[len(self._buffer) - keep :]
+            break
+        return "".join(output)
+
+    def finish(self) -> str:
+        """流结束时输出剩余内容；思考块未闭合时抛出 UnclosedThinkError，由批次重试"""
+        if self._inside:
+            raise UnclosedThinkError()
+        rest = self._emit(self._buffer)
+        self._buffer = ""
+        self._held_whitespace = ""
+        return rest
+
+    def _partial_tag_length(self, text: str) -> int:
+        for length in range(min(len(text), len(self.OPEN_TAG) - 1), 0, -1):
+            if self.OPEN_TAG.startswith(text[-length:]):
+                return length
+        return 0
+
+    def _emit(self, text: str) -> str:
+        if self._strip_leading:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._strip_leading = False
+        text = self._held_whitespace + text
+        stripped = text.rstrip()
+        self._held_whitespace = text[len(stripped) :]
+        return stripped
+
+
+async def filter_thinking(stream):
+    """包装模型输出流，去除其中的思考内容"""
+    think_filter = ThinkFilter()
+    async with aclosing(stream):
+        async for piece in stream:
+            if text := think_filter.feed(piece):
+                yield text
+    if text := think_filter.finish():
+        yield text
+
+
+async def iterate_in_thread(make_iterator):
+    """在线程池中逐项消费同步迭代器，用于没有异步接口的 SDK"""
+    loop = asyncio.get_running_loop()
+    iterator = await loop.run_in_executor(None, lambda: iter(make_iterator()))
+    done = object()
+    while True:
+        item = await loop.run_in_executor(None, next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中日韩字符约 1 token/字，其余约 4 字符/token"""
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+def parse_srt_block(block: str):
+    """解析单条 srt 字幕块，返回 (序号, 时间轴, 文本)，格式不符时返回 None"""
+    lines = block.strip("\n").split("\n")
+    if len(lines) < 2 or "-->" not in lines[1]:
+        return None
+    return lines[0].strip(), lines[1].strip(), "\n".join(lines[2:])
+
+
+def is_placeholder(text: str) -> bool:
+    """只有空白或符号（如 *、♪、…）的字幕无需翻译"""
+    return not any(ch.isalnum() for ch in text)
+
+
+def dedupe_key(text: str) -> str:
+    """去重用的原文键：在翻译记忆的规范化基础上再去掉所有空白，OCR 常在字间插入空格"""
+    return re.sub(r"\s+", "", normalize_source(text))
 
 
 @dataclass
@@ -49,6 +242,29 @@ class TranslateTask:
         # Deepseek 专属参数
         self.deepseek_model = self.args.get("deepseek_model", "deepseek-v4-flash")
         self.deepseek_reasoning = self.args.get("deepseek_reasoning", False)
+        # 项目批量翻译时各集共用的术语表 {原文: 译文}
+        self.glossary = self.args.get("glossary", {})
+        # 用量与耗时统计，任务结束后显示在任务卡片上
+        self.metrics_summary = ""
+        self.metrics_detail = ""
+
+
+class RateLimiter:
+    """滑动窗口限流：限制一分钟内发出的请求数"""
+
+    def __init__(self):
+        self._sent = deque()
+
+    async def acquire(self, per_minute: int) -> None:
+        """等待直到可以发出请求，per_minute 为 0 时不限制"""
+        while per_minute > 0:
+            now = time.monotonic()
+            while self._sent and now - self._sent[0] >= 60:
+                self._sent.popleft()
+            if len(self._sent) < per_minute:
+                self._sent.append(now)
+                return
+            await asyncio.sleep(60 - (now - self._sent[0]))
 
 
 class BaseTranslateService(ABC):
@@ -56,48 +272,148 @@ class BaseTranslateService(ABC):
 
     ERROR_MAP = AI_ERROR_MAP
 
+    # 同一服务商同时进行的请求数上限，在所有翻译任务间共享
+    max_concurrency = 4
+    # 单个批次待翻译内容的 token 预算，译文长度与原文相近，需低于模型的最大输出
+    max_batch_tokens = 3000
+    # 是否支持 stream_options.include_usage，在流的最后返回 token 用量
+    stream_usage = False
+    _semaphores = {}
+    _semaphores_lock = threading.Lock()
+
+    @classmethod
+    def get_semaphore(cls) -> asyncio.Semaphore:
+        with cls._semaphores_lock:
+            if cls not in cls._semaphores:
+                cls._semaphores[cls] = asyncio.Semaphore(cls.max_concurrency)
+            return cls._semaphores[cls]
+
+    _rate_limiters = {}
+
+    @classmethod
+    def get_rate_limiter(cls) -> RateLimiter:
+        with cls._semaphores_lock:
+            if cls not in cls._rate_limiters:
+                cls._rate_limiters[cls] = RateLimiter()
+            return cls._rate_limiters[cls]
+
+    # 复用的API客户端（含HTTP连接池），按服务类缓存，配置变化时重建
+    _clients = {}
+    _clients_lock = threading.Lock()
+
     @abstractmethod
-    def get_client(self):
+    def get_client_config(self) -> dict:
+        """返回创建客户端所需的参数，如 api_key、base_url"""
         pass
 
+    def create_client(self, config: dict):
+        return AsyncOpenAI(**config)
+
+    def get_client(self):
+        config = self.get_client_config()
+        key = tuple(sorted(config.items()))
+        cls = type(self)
+        with self._clients_lock:
+            cached = self._clients.get(cls)
+            if cached is None or cached[0] != key:
+                # 旧客户端可能仍被进行中的请求使用，交给垃圾回收释放
+                cached = (key, self.create_client(config))
+                self._clients[cls] = cached
+            return cached[1]
+
     @abstractmethod
     def get_model_name(self) -> str:
         pass
 
-    def translate(
-        self, origin_lang: str, target_lang: str, content: str, temperature: float
-    ) -> Generator[str, None, None]:
-        prompt = cfg.get(cfg.promptTemplate).format(
+    @staticmethod
+    def build_prompt(
+        origin_lang: str,
+        target_lang: str,
+        content: str,
+        context: str = "",
+        template: str = None,
+    ) -> str:
+        template = template or cfg.get(cfg.promptTemplate)
+        prompt = template.format(
             origin_lang=origin_lang,
             target_lang=target_lang,
             content=content,
         )
+        if context:
+            prompt = (
+                f"以下是待翻译内容之前的几句字幕，仅用于理解上下文，不要翻译或输出：\n"
+                f"{context}\n\n{prompt}"
+            )
+        return prompt
+
+    def build_request(self, prompt: str, temperature: float) -> dict:
+        """构建 chat.completions.create 的参数，子类可追加厂商专属参数"""
+        create_params = {
+            "model": self.get_model_name(),
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True,
+            "temperature": temperature,
+        }
+        if self.stream_usage:
+            create_params["stream_options"] = {"include_usage": True}
+        return create_params
+
+    async def translate(
+        self,
+        origin_lang: str,
+        target_lang: str,
+        content: str,
+        temperature: float,
+        context: str = "",
+        template: str = None,
+        metrics: BatchMetrics = None,
+    ) -> AsyncGenerator[str, None]:
+        prompt = self.build_prompt(origin_lang, target_lang, content, context, template)
         print(prompt)
-        model = self.get_model_name()
-        if model == "spark-lite":
-            try:
-                response = self.get_client()
-                messages = [{"role": "user", "content": prompt}]
-                handler = ChunkPrintHandler()
-                a = response.stream(messages, callbacks=[handler])
-                for chunk in a:
-                    yield chunk.content
-            except Exception as e:
-                print(e)
-                raise e
-        else:
-            try:
-                response = self.get_client().chat.completions.create(
-                    model=self.get_model_name(),
-                    messages=[{"role": "user", "content": prompt}],
-                    stream=True,
-                    temperature=temperature,
-                )
-                for chunk in response:
-                    if content_piece := chunk.choices[0].delta.content:
-                        yield content_piece
-            except Exception as e:
-                raise e
+        if metrics is not None:
+            metrics.prompt_tokens = estimate_tokens(prompt)
+
+        response = await self.get_client().chat.completions.create(
+            **self.build_request(prompt, temperature)
+        )
+        # 提前停止读取（取消、重试）时也立即关闭 HTTP 连接
+        async with response:
+            async for chunk in response:
+                if metrics is not None and (usage := getattr(chunk, "usage", None)):
+                    metrics.prompt_tokens = usage.prompt_tokens
+                    metrics.completion_tokens = usage.completion_tokens
+                    metrics.estimated = False
+                if chunk.choices and (content_piece := chunk.choices[0].delta.content):
+                    yield content_piece
+
+    @staticmethod
+    def is_retryable_error(error: Exception) -> bool:
+        """限流、超时、服务端错误等临时性错误可以重试"""
+        if isinstance(error, UnclosedThinkError):
+            return True
+        if isinstance(error, APIStatusError):
+            message = str(error.message).lower()
+            if any(key in message for key in NON_RETRYABLE_KEYWORDS):
+                return False
+            return error.status_code in RETRYABLE_STATUS_CODES
+        # 超时 APITimeoutError 属于 APIConnectionError；讯飞 SDK 的连接错误继承 ConnectionError
+        return isinstance(error, (APIConnectionError, ConnectionError, TimeoutError))
+
+    @staticmethod
+    def get_retry_after(error: Exception):
+        """读取响应头中的 Retry-After（秒数或 HTTP 日期），没有时返回 None"""
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        value = headers.get("retry-after") if headers is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
 
     @classmethod
     def analysis_error(cls, error_str: str) -> str:
@@ -109,57 +425,42 @@ class BaseTranslateService(ABC):
 
 
 class DeepseekService(BaseTranslateService):
+    max_batch_tokens = 6000
+    stream_usage = True
+
     def __init__(self, task: TranslateTask = None):
         self.task = task
 
-    def get_client(self):
-        return OpenAI(
-            api_key=cfg.get(cfg.deepseekApiKey), base_url="https://api.deepseek.com"
-        )
+    def get_client_config(self):
+        return {
+            "api_key": cfg.get(cfg.deepseekApiKey),
+            "base_url": "https://api.deepseek.com",
+        }
 
     def get_model_name(self):
         if self.task:
             return self.task.deepseek_model
         return cfg.get(cfg.deepseekModel)
 
-    def translate(
-        self, origin_lang: str, target_lang: str, content: str, temperature: float
-    ) -> Generator[str, None, None]:
-        prompt = cfg.get(cfg.promptTemplate).format(
-            origin_lang=origin_lang,
-            target_lang=target_lang,
-            content=content,
-        )
-        print(prompt)
+    def build_request(self, prompt, temperature):
+        create_params = super().build_request(prompt, temperature)
 
-        try:
-            # 构建基础参数
-            create_params = {
-                "model": self.get_model_name(),
-                "messages": [{"role": "user", "content": prompt}],
-                "stream": True,
-                "temperature": temperature,
-            }
-
-            # 如果启用深度思考模式
-            if self.task and self.task.deepseek_reasoning:
-                create_params["reasoning_effort"] = "high"
-                create_params["extra_body"] = {"thinking": {"type": "enabled"}}
-
-            response = self.get_client().chat.completions.create(**create_params)
-            for chunk in response:
-                if content_piece := chunk.choices[0].delta.content:
-                    yield content_piece
-        except Exception as e:
-            raise e
+        # 如果启用深度思考模式
+        if self.task and self.task.deepseek_reasoning:
+            create_params["reasoning_effort"] = "high"
+            create_params["extra_body"] = {"thinking": {"type": "enabled"}}
+        return create_params
 
 
 class GLMService(BaseTranslateService):
-    def get_client(self):
-        return OpenAI(
-            api_key=cfg.get(cfg.glmApiKey),
-            base_url="https://open.bigmodel.cn/api/paas/v4/",
-        )
+    max_batch_tokens = 8000
+    stream_usage = True
+
+    def get_client_config(self):
+        return {
+            "api_key": cfg.get(cfg.glmApiKey),
+            "base_url": "https://open.bigmodel.cn/api/paas/v4/",
+        }
         # return ZhipuAiClient(api_key=cfg.get(cfg.glmApiKey))
 
     def get_model_name(self):
@@ -167,59 +468,95 @@ class GLMService(BaseTranslateService):
 
 
 class SparkLiteService(BaseTranslateService):
-    def get_client(self):
-        return ChatSparkLLM(
-            spark_api_url="wss://spark-api.xf-yun.com/v1.1/chat",
-            spark_app_id=cfg.get(cfg.sparkAppId),
-            spark_api_key=cfg.get(cfg.sparkApiKey),
-            spark_api_secret=cfg.get(cfg.sparkApiSecret),
-            spark_llm_domain="lite",
-            streaming=True,
-        )
+    # 讯飞免费接口 QPS 较低
+    max_concurrency = 2
+    max_batch_tokens = 2000
+
+    def get_client_config(self):
+        return {
+            "spark_api_url": "wss://spark-api.xf-yun.com/v1.1/chat",
+            "spark_app_id": cfg.get(cfg.sparkAppId),
+            "spark_api_key": cfg.get(cfg.sparkApiKey),
+            "spark_api_secret": cfg.get(cfg.sparkApiSecret),
+        }
+
+    def create_client(self, config):
+        return ChatSparkLLM(**config, spark_llm_domain="lite", streaming=True)
 
     def get_model_name(self):
         return "spark-lite"
 
+    async def translate(
+        self,
+        origin_lang: str,
+        target_lang: str,
+        content: str,
+        temperature: float,
+        context: str = "",
+        template: str = None,
+        metrics: BatchMetrics = None,
+    ) -> AsyncGenerator[str, None]:
+        prompt = self.build_prompt(origin_lang, target_lang, content, context, template)
+        print(prompt)
+        if metrics is not None:
+            metrics.prompt_tokens = estimate_tokens(prompt)
+
+        # 讯飞 SDK 只有同步流式接口，放到线程池中逐块读取
+        messages = [{"role": "user", "content": prompt}]
+        client = self.get_client()
+        async for chunk in iterate_in_thread(
+            lambda: client.stream(messages, callbacks=[ChunkPrintHandler()])
+        ):
+            yield chunk.content
+
 
 class HunyuanService(BaseTranslateService):
-    def get_client(self):
-        return OpenAI(
-            api_key=cfg.get(cfg.hunyuanApiKey),
-            base_url="https://api.hunyuan.cloud.tencent.com/v1",
-        )
+    max_batch_tokens = 8000
+
+    def get_client_config(self):
+        return {
+            "api_key": cfg.get(cfg.hunyuanApiKey),
+            "base_url": "https://api.hunyuan.cloud.tencent.com/v1",
+        }
 
     def get_model_name(self):
         return "hunyuan-turbos-latest"
 
 
 class InternService(BaseTranslateService):
-    def get_client(self):
-        return OpenAI(
-            api_key=cfg.get(cfg.internApiKey),
-            base_url="https://chat.intern-ai.org.cn/api/v1",
-        )
+    def get_client_config(self):
+        return {
+            "api_key": cfg.get(cfg.internApiKey),
+            "base_url": "https://chat.intern-ai.org.cn/api/v1",
+        }
 
     def get_model_name(self):
         return "intern-latest"
 
 
 class ErnieSpeedService(BaseTranslateService):
-    def get_client(self):
-        return OpenAI(
-            api_key=cfg.get(cfg.ernieSpeedApiKey),
-            base_url="https://qianfan.baidubce.com/v2/",
-        )
+    max_batch_tokens = 2500
+    stream_usage = True
+
+    def get_client_config(self):
+        return {
+            "api_key": cfg.get(cfg.ernieSpeedApiKey),
+            "base_url": "https://qianfan.baidubce.com/v2/",
+        }
 
     def get_model_name(self):
         return "ernie-speed-128k"
 
 
 class GeminiService(BaseTranslateService):
-    def get_client(self):
-        return OpenAI(
-            api_key=cfg.get(cfg.geminiApiKey),
-            base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-        )
+    max_batch_tokens = 16000
+    stream_usage = True
+
+    def get_client_config(self):
+        return {
+            "api_key": cfg.get(cfg.geminiApiKey),
+            "base_url": "https://generativelanguage.googleapis.com/v1beta/openai/",
+        }
 
     def get_model_name(self):
         return "gemini-3-flash-preview"
@@ -228,7 +565,7 @@ class GeminiService(BaseTranslateService):
 class CustomModelService(BaseTranslateService):
     """自定义模型服务类"""
 
-    def get_client(self):
+    def get_client_config(self):
         if not cfg.get(cfg.customModelEnabled):
             raise Exception("自定义模型未启用")
 
@@ -250,7 +587,7 @@ class CustomModelService(BaseTranslateService):
 
         normalized_base = _normalize_base_url(base_url)
 
-        return OpenAI(api_key=api_key, base_url=normalized_base)
+        return {"api_key": api_key, "base_url": normalized_base}
 
     def get_model_name(self):
         if not cfg.get(cfg.customModelEnabled):
@@ -268,7 +605,81 @@ class CustomModelService(BaseTranslateService):
         return model_name
 
 
-class TranslateThread(QThread):
+class _BatchRestart:
+    """批次重试标记：写入端收到后丢弃该批次已输出的内容"""
+
+    def __init__(self, service):
+        self.service = service
+
+
+class _LocalCue:
+    """本地处理的字幕（占位符或重复原文）标记，由写入端按顺序填入译文"""
+
+    def __init__(self, index):
+        self.index = index
+
+
+class SignalBridge(QObject):
+    """后台事件循环中发出的 Qt 信号统一放入一个线程安全队列，由主线程依次发出"""
+
+    def __init__(self):
+        super().__init__()
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._scheduled = False
+
+    def post(self, signal, *args):
+        self._queue.put((signal, args))
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        QMetaObject.invokeMethod(self, "drain", Qt.ConnectionType.QueuedConnection)
+
+    @Slot()
+    def drain(self):
+        with self._lock:
+            self._scheduled = False
+        while True:
+            try:
+                signal, args = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                signal.emit(*args)
+            except RuntimeError:
+                # 发出信号的对象已被销毁，跳过它，不影响队列中其他信号
+                continue
+
+
+class TranslateEngine:
+    """所有翻译任务共用一个 asyncio 事件循环，运行在单独的后台线程中"""
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="TranslateEngine", daemon=True
+                ).start()
+            return self._loop
+
+    def submit(self, coro):
+        """提交协程，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+
+
+signal_bridge = SignalBridge()
+translate_engine = TranslateEngine()
+
+
+class TranslateJob(QObject):
+    """单个翻译任务，在共享的事件循环中运行，接口与其他任务线程一致"""
+
     finished_signal = Signal(bool, str)
     cancelled_signal = Signal()
 
@@ -287,99 +698,991 @@ class TranslateThread(QThread):
         super().__init__()
         self.logger = Logger("TranslateProcess", "translate")
         self.task = task
+        self._future = None
+        self.metrics_store = None
+        self.batch_metrics = []
         self._is_running = True
+        self._batches_cancelled = False
+        self.memory = None
+        # 去重预处理：{字幕块下标: 相同原文首次出现的下标}，占位符字幕对应 None
+        self.local_cues = {}
+        # 增量翻译中沿用上次译文的字幕块下标，不会再发送给模型
+        self.reused_cues = set()
+        # 已输出字幕的译文文本，供后面的重复字幕直接使用
+        self._translations = {}
+        self._pending_output = []
+        self._last_flush = 0.0
+        # 当前批次已发给预览的译文，批次重试时整段撤回
+        self._batch_output = []
+        self.structured = cfg.get(cfg.translateStructuredMode)
+        self.prompt_template = (
+            STRUCTURED_PROMPT_TEMPLATE
+            if self.structured
+            else cfg.get(cfg.promptTemplate)
+        )
+        # 实际发送的 Prompt 附带术语表；术语表不参与翻译记忆、断点与快照的键，
+        # 同一系列补充术语后仍能沿用已有的译文
+        self.request_template = self._with_glossary(self.prompt_template)
+
+    def start(self):
+        self._future = translate_engine.submit(self._run())
+
+    def wait(self, timeout=None):
+        """阻塞等待任务结束，供脚本使用"""
+        if self._future is not None:
+            self._future.result(timeout)
 
-    def run(self):
+    def _emit(self, signal, *args):
+        signal_bridge.post(signal, *args)
+
+    async def _run(self):
         try:
             service_cls = self.SERVICES.get(self.task.AI)
             if not service_cls:
-                event_bus.translate_finished_signal.emit(
-                    False, f"不支持的AI模型: {self.task.AI}"
+                self._emit(
+                    event_bus.translate_finished_signal,
+                    False,
+                    f"不支持的AI模型: {self.task.AI}",
                 )
                 self.logger.error(f"不支持的AI模型: {self.task.AI}")
                 return
 
-            service = (
-                service_cls(self.task)
-                if service_cls == DeepseekService
-                else service_cls()
+            service = self._create_service(service_cls)
+            services = [service]
+            fallback_cls = self.SERVICES.get(
+                AI_model_dict.get(cfg.get(cfg.translateFallbackModel))
             )
-            chunks_to_translate = self.task.raw_content.split("\n\n")
-            batch_size = 50
+            if fallback_cls and fallback_cls is not service_cls:
+                services.append(self._create_service(fallback_cls))
 
-            with open(self.task.output_file, "w", encoding="utf-8") as f:
-                for i in range(0, len(chunks_to_translate), batch_size):
-                    # 检查状态
-                    if not self._is_running:
-                        break
+            try:
+                self.metrics_store = await asyncio.to_thread(TranslateMetricsStore)
+            except sqlite3.Error as e:
+                self.logger.warning(f"打开用量统计失败: {e}")
 
-                    batch_content = "\n\n".join(chunks_to_translate[i : i + batch_size])
+            chunks_to_translate = self.task.raw_content.split("\n\n")
+            manifest_key = self._get_manifest_key()
+            resume_from, resumed_text = self._load_manifest(
+                manifest_key, len(chunks_to_translate)
+            )
+            memory_hits = await asyncio.to_thread(
+                self._lookup_memory,
+                service,
+                chunks_to_translate[resume_from:],
+                resume_from,
+            )
+            # 上次的译文优先于翻译记忆，保留手动修改过的译文
+            reused = await asyncio.to_thread(
+                self._reuse_previous, chunks_to_translate, resume_from
+            )
+            memory_hits.update(reused)
+            self.reused_cues = set(reused)
+            self.local_cues = self._plan_local_cues(
+                chunks_to_translate, memory_hits, resume_from
+            )
+            segments = self._plan_segments(
+                chunks_to_translate,
+                memory_hits,
+                self._get_batch_budget(service),
+                resume_from,
+            )
 
-                    # 传递运行状态检查
-                    for text_piece in service.translate(
-                        self.task.origin_lang,
-                        self.task.target_lang,
-                        batch_content,
-                        self.task.temperature,
-                    ):
+            # 每个远程批次一个队列，并发翻译（受服务商信号量限制），这里按顺序写入
+            remote_batches = [
+                (
+                    indices,
+                    self._build_context(chunks_to_translate, indices[0]),
+                    asyncio.Queue(),
+                )
+                for is_remote, indices in segments
+                if is_remote
+            ]
+            # 输出文件即将被覆盖，旧的原文快照不再与之对应
+            self._remove_snapshot()
+            # 不转换换行符：断点记录的偏移量按字节计算，续翻时原样读回已完成部分
+            with open(self.task.output_file, "w", encoding="utf-8", newline="") as f:
+                batch_tasks = [
+                    asyncio.create_task(
+                        self._translate_batch(
+                            services, chunks_to_translate, indices, context, batch_queue
+                        )
+                    )
+                    for indices, context, batch_queue in remote_batches
+                ]
+
+                try:
+                    if resume_from:
+                        self.logger.info(
+                            f"从第 {resume_from + 1} 条字幕继续翻译: {self.task.input_file}"
+                        )
+                        self._write_and_notify(resumed_text, f)
+                        self._flush_output(f)
+
+                    pending_batches = iter(remote_batches)
+                    for is_remote, indices in segments:
+                        # 检查状态
                         if not self._is_running:
                             break
-                        self._write_and_notify(text_piece, f)
 
-                    f.write("\n\n")
+                        if not is_remote:
+                            # 命中翻译记忆或无需翻译，直接输出
+                            self._write_and_notify(
+                                "\n\n".join(
+                                    self._local_block(
+                                        chunks_to_translate, memory_hits, i
+                                    )
+                                    for i in indices
+                                ),
+                                f,
+                            )
+                            self._write_and_notify("\n\n", f)
+                            self._save_manifest(manifest_key, indices[-1] + 1, f)
+                            continue
+
+                        # 当前批次实时输出，后续批次在各自队列中缓存
+                        _, _, batch_queue = next(pending_batches)
+                        batch_content = "\n\n".join(
+                            chunks_to_translate[i] for i in indices
+                        )
+                        pieces = []
+                        batch_service = service
+                        self._flush_output(f)
+                        batch_start = f.tell()
+                        self._batch_output = []
+                        while self._is_running:
+                            try:
+                                item = await asyncio.wait_for(
+                                    batch_queue.get(), OUTPUT_FLUSH_INTERVAL_SEC
+                                )
+                            except asyncio.TimeoutError:
+                                self._flush_output(f, force=False)
+                                continue
+                            if item is None:
+                                if not self.structured:
+                                    self._record_translations(
+                                        chunks_to_translate, indices, "".join(pieces)
+                                    )
+                                await asyncio.to_thread(
+                                    self._remember_batch,
+                                    batch_service,
+                                    batch_content,
+                                    "".join(pieces),
+                                )
+                                break
+                            if isinstance(item, Exception):
+                                raise item
+                            if isinstance(item, _BatchRestart):
+                                self._rewind_output(f, batch_start)
+                                pieces = []
+                                batch_service = item.service
+                                continue
+                            if isinstance(item, _LocalCue):
+                                item = self._resolve_local_cue(
+                                    chunks_to_translate, item.index
+                                )
+                            pieces.append(item)
+                            self._write_and_notify(item, f)
+
+                        self._write_and_notify("\n\n", f)
+                        if self._is_running:
+                            self._save_manifest(manifest_key, indices[-1] + 1, f)
+                finally:
+                    self._flush_output(f)
+                    # 出错或取消时停止其余批次
+                    self._batches_cancelled = True
+                    for batch_task in batch_tasks:
+                        batch_task.cancel()
+                    await asyncio.gather(*batch_tasks, return_exceptions=True)
 
             # 正常运行结束或被拦截后的信号处理
             if not self._is_running:
                 # 如果是因为取消而停止，发送取消信号
-                self.cancelled_signal.emit()
+                self._emit(self.cancelled_signal)
                 self.logger.info(f"翻译任务已取消: {self.task.input_file}")
             else:
-                # 翻译完成后进行后处理：去除思考内容
-                try:
-                    self._post_process_translation()
-                    self.finished_signal.emit(True, "翻译完成")
-                    event_bus.translate_finished_signal.emit(
-                        True, ["", self.task.output_file]
-                    )
-                    self.logger.info(f"翻译任务已完成: {self.task.input_file}")
-                except Exception as e:
-                    error_msg = f"后处理失败: {str(e)}"
-                    self.finished_signal.emit(False, error_msg)
-                    event_bus.translate_finished_signal.emit(False, [error_msg])
-                    self.logger.error(
-                        f"翻译后处理失败: {self.task.input_file} - {error_msg}"
-                    )
+                self._remove_manifest()
+                self._save_snapshot()
+                await self._summarize_metrics()
+                self._emit(self.finished_signal, True, "翻译完成")
+                self._emit(
+                    event_bus.translate_finished_signal,
+                    True,
+                    ["", self.task.output_file],
+                )
+                self.logger.info(f"翻译任务已完成: {self.task.input_file}")
 
         except Exception as e:
-            # 如果是报错导致的线程停止，不再发取消信号，只发错误信号
+            # 如果是报错导致的任务停止，不再发取消信号，只发错误信号
             error_msg = BaseTranslateService.analysis_error(str(e))
-            self.finished_signal.emit(False, f"翻译失败: {error_msg}")
-            event_bus.translate_finished_signal.emit(False, [error_msg])
+            self._emit(self.finished_signal, False, f"翻译失败: {error_msg}")
+            self._emit(event_bus.translate_finished_signal, False, [error_msg])
             self.logger.error(f"翻译任务失败: {self.task.input_file} - {error_msg}")
 
-    def _post_process_translation(self):
-        """翻译后处理：去除思考内容"""
-        # 读取翻译后的文件内容
-        with open(self.task.output_file, "r", encoding="utf-8") as f:
-            content = f.read()
+    def _memory_key(self, service):
+        return (
+            self.task.origin_lang,
+            self.task.target_lang,
+            service.get_model_name(),
+            hash_prompt(self.prompt_template),
+        )
+
+    def _lookup_memory(self, service, chunks, start=0):
+        """查询翻译记忆，返回 {字幕块下标: 已翻译的 srt 字幕块}，下标从 start 开始计"""
+        if not cfg.get(cfg.useTranslationMemory):
+            self.memory = None
+            return {}
+
+        cues = {i: parse_srt_block(chunk) for i, chunk in enumerate(chunks, start)}
+        cues = {i: cue for i, cue in cues.items() if cue and cue[2].strip()}
+        try:
+            self.memory = TranslationMemory()
+            found = self.memory.lookup(
+                [text for _, _, text in cues.values()], *self._memory_key(service)
+            )
+        except sqlite3.Error as e:
+            self.logger.warning(f"读取翻译记忆失败: {e}")
+            self.memory = None
+            return {}
+
+        hits = {}
+        for i, (index, timing, text) in cues.items():
+            translation = found.get(normalize_source(text))
+            if translation is not None:
+                hits[i] = f"{index}\n{timing}\n{translation}"
+
+        if hits:
+            self.logger.info(
+                f"翻译记忆命中 {len(hits)}/{len(chunks)} 条: {self.task.input_file}"
+            )
+        return hits
+
+    def _reuse_previous(self, chunks, start=0):
+        """增量翻译：与上次翻译时的原文对比，返回 {字幕块下标: 沿用上次译文的字幕块}
+
+        只在原文有改动时生效，原文未变时重新翻译视为要完整重译
+        """
+        if start or not cfg.get(cfg.incrementalTranslate):
+            return {}
+        try:
+            with open(self._snapshot_path(), "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if (
+                snapshot.get("version") != SNAPSHOT_VERSION
+                or snapshot.get("key") != self._get_settings_key()
+                or snapshot["source"] == self.task.raw_content
+            ):
+                return {}
+            with open(self.task.output_file, "r", encoding="utf-8") as f:
+                previous_output = f.read()
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+        # 上次的译文按序号对应到上次的原文
+        translations = {}
+        for block in re.split(r"\n\s*\n", previous_output.strip()):
+            cue = parse_srt_block(block)
+            if cue:
+                translations.setdefault(cue[0], cue[2])
+        old_chunks = snapshot["source"].split("\n\n")
+        old_cues = [parse_srt_block(chunk) for chunk in old_chunks]
+        new_cues = [parse_srt_block(chunk) for chunk in chunks]
+
+        def align_key(cue, chunk):
+            if not cue:
+                return 0, dedupe_key(chunk)
+            timing = parse_time_range(cue[1])
+            return (timing[0] if timing else 0), dedupe_key(cue[2])
+
+        matches = align_cues(
+            [align_key(cue, chunk) for cue, chunk in zip(old_cues, old_chunks)],
+            [align_key(cue, chunk) for cue, chunk in zip(new_cues, chunks)],
+        )
+        reused = {}
+        for j, i in matches.items():
+            old_cue, new_cue = old_cues[i], new_cues[j]
+            if old_cue and new_cue and old_cue[0] in translations:
+                # 序号和时间轴使用新原文的，时间轴调整不需要重新翻译
+                reused[j] = f"{new_cue[0]}\n{new_cue[1]}\n{translations[old_cue[0]]}"
+
+        self.logger.info(
+            f"原文有 {len(chunks) - len(reused)} 条字幕改动或新增，"
+            f"沿用上次译文 {len(reused)}/{len(chunks)} 条: {self.task.input_file}"
+        )
+        return reused
+
+    def _plan_local_cues(self, chunks, memory_hits, start=0):
+        """去重预处理：只有符号的字幕原样保留，原文相同的字幕只翻译首次出现的一条
+
+        返回 {字幕块下标: 首次出现的下标}，占位符字幕对应 None
+        """
+        local = {}
+        first_seen = {}
+        for i in range(start, len(chunks)):
+            cue = parse_srt_block(chunks[i])
+            if not cue:
+                continue
+            if is_placeholder(cue[2]):
+                local[i] = None
+                continue
+            key = dedupe_key(cue[2])
+            if key in first_seen and i not in memory_hits:
+                local[i] = first_seen[key]
+            else:
+                first_seen.setdefault(key, i)
+
+        duplicates = sum(1 for canonical in local.values() if canonical is not None)
+        if local:
+            self.logger.info(
+                f"跳过 {len(local) - duplicates} 条占位字幕，"
+                f"{duplicates} 条重复字幕沿用首次译文: {self.task.input_file}"
+            )
+        return local
+
+    def _resolve_local_cue(self, chunks, i):
+        """生成本地处理的字幕块：占位符原样输出，重复字幕沿用首次出现时的译文"""
+        canonical = self.local_cues[i]
+        if canonical is None:
+            return chunks[i].strip("\n")
+        index, timing, text = parse_srt_block(chunks[i])
+        # 首次出现的那条未能按序号解析出译文时保留原文
+        translation = self._translations.get(canonical, text)
+        return f"{index}\n{timing}\n{translation}"
+
+    def _record_translations(self, chunks, indices, output):
+        """按序号记下批次中各条字幕的译文，供后面的重复字幕使用"""
+        positions = {}
+        for i in indices:
+            cue = parse_srt_block(chunks[i])
+            if cue:
+                positions.setdefault(cue[0], i)
+        for block in re.split(r"\n\s*\n", output.strip()):
+            cue = parse_srt_block(block)
+            if cue and cue[0] in positions:
+                self._translations[positions[cue[0]]] = cue[2]
+
+    def _local_block(self, chunks, memory_hits, i):
+        if i in self.local_cues:
+            return self._resolve_local_cue(chunks, i)
+        cue = parse_srt_block(memory_hits[i])
+        self._translations[i] = cue[2]
+        return memory_hits[i]
+
+    def _get_batch_budget(self, service):
+        """单批次可用于待翻译内容的 token 数：模型预算减去 Prompt 与上文的开销"""
+        overhead = estimate_tokens(
+            service.build_prompt(
+                self.task.origin_lang,
+                self.task.target_lang,
+                "",
+                template=self.request_template,
+            )
+        )
+        context_overhead = CONTEXT_CUES * 30
+        return max(500, service.max_batch_tokens - overhead - context_overhead)
+
+    def _pack_batches(self, chunks, indices, budget):
+        """按 token 预算把连续的字幕块装入批次，本地处理的字幕不占预算，跟随前一条字幕"""
+        batches = []
+        current = []
+        current_tokens = 0
+        for i in indices:
+            tokens = 0 if i in self.local_cues else estimate_tokens(chunks[i])
+            if (
+                current
+                and tokens
+                and (current_tokens + tokens > budget or len(current) >= MAX_BATCH_CUES)
+            ):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _build_context(self, chunks, first_index):
+        """取批次之前几条字幕的原文作为上文"""
+        lines = []
+        for chunk in chunks[max(0, first_index - CONTEXT_CUES) : first_index]:
+            cue = parse_srt_block(chunk)
+            text = cue[2] if cue else chunk
+            if text.strip():
+                lines.append(text.strip())
+        return "\n".join(lines)
+
+    def _plan_segments(self, chunks, memory_hits, budget, start=0):
+        """把 start 之后的字幕块划分为按顺序输出的片段：(是否需要远程翻译, 字幕块下标列表)"""
+        runs = []
+        for i in range(start, len(chunks)):
+            is_remote = i not in memory_hits and i not in self.local_cues
+            if runs and runs[-1][0] == is_remote:
+                runs[-1][1].append(i)
+            else:
+                runs.append((is_remote, [i]))
+
+        # 夹在待翻译内容之间的零星命中并入远程批次，避免把请求切得太碎
+        # 其中的占位符和重复字幕不会发送，在批次输出中就地填入
+        # 沿用上次译文的字幕不并入，以免重新翻译覆盖手动修改过的译文
+        merged = []
+        for pos, (is_remote, indices) in enumerate(runs):
+            between_remote = 0 < pos < len(runs) - 1
+            if (
+                not is_remote
+                and between_remote
+                and len(indices) < MIN_MEMORY_RUN
+                and self.reused_cues.isdisjoint(indices)
+            ):
+                is_remote = True
+            if merged and merged[-1][0] == is_remote:
+                merged[-1][1].extend(indices)
+            else:
+                merged.append((is_remote, indices))
+
+        segments = []
+        for is_remote, indices in merged:
+            if not is_remote:
+                segments.append((False, indices))
+                continue
+            for batch in self._pack_batches(chunks, indices, budget):
+                segments.append((True, batch))
+        return segments
+
+    def _remember_batch(self, service, batch_content, output):
+        """批次翻译完成后写入翻译记忆，序号对不上时放弃，避免错位"""
+        if self.memory is None:
+            return
+
+        sources = {}
+        for block in batch_content.split("\n\n"):
+            cue = parse_srt_block(block)
+            if cue:
+                sources[cue[0]] = cue[2]
+
+        translations = {}
+        for block in re.split(r"\n\s*\n", output.strip()):
+            cue = parse_srt_block(block)
+            if cue:
+                translations[cue[0]] = cue[2]
+
+        if not sources or sources.keys() != translations.keys():
+            return
+        # 与原文相同的“译文”多半是未翻译的内容，不写入
+        pairs = [
+            (sources[index], translations[index])
+            for index in sources
+            if normalize_source(translations[index]) != normalize_source(sources[index])
+        ]
+        try:
+            self.memory.store(pairs, *self._memory_key(service))
+        except sqlite3.Error as e:
+            self.logger.warning(f"写入翻译记忆失败: {e}")
+
+    async def _stream_structured(self, service, chunks, indices, context):
+        """结构化模式：按「编号|文本」收发，边接收边解析，按顺序输出 srt 字幕块，只重试缺失的编号"""
+        cues = {}
+        # (字幕块下标, 编号)，本地处理的字幕不发送，编号为 None
+        order = []
+        for i in indices:
+            if i in self.local_cues:
+                order.append((i, None))
+                continue
+            cue_id = str(len(cues) + 1)
+            cue = parse_srt_block(chunks[i])
+            cues[cue_id] = cue if cue else (None, None, chunks[i])
+            order.append((i, cue_id))
+        received = {}
+        position = 0
+
+        def flush():
+            nonlocal position
+            while position < len(order):
+                i, cue_id = order[position]
+                separator = "\n\n" if position else ""
+                if cue_id is None:
+                    if separator:
+                        yield separator
+                    yield _LocalCue(i)
+                elif cue_id in received:
+                    index, timing, _ = cues[cue_id]
+                    text = received[cue_id]
+                    self._translations[i] = text
+                    block = f"{index}\n{timing}\n{text}" if timing else text
+                    yield separator + block
+                else:
+                    return
+                position += 1
+
+        def accept(line):
+            match = STRUCTURED_RECORD_PATTERN.match(line)
+            if match and match.group(1) in cues and match.group(1) not in received:
+                received[match.group(1)] = match.group(2).replace("\\n", "\n").strip()
+
+        pending = list(cues)
+        for attempt in range(STRUCTURED_MAX_ATTEMPTS):
+            if not pending:
+                break
+            if attempt:
+                self.logger.warning(
+                    f"结构化翻译缺失 {len(pending)} 条，第 {attempt} 次重试: {self.task.input_file}"
+                )
+            content = "\n".join(
+                f"{cue_id}|" + cues[cue_id][2].replace("\n", "\\n")
+                for cue_id in pending
+            )
+
+            buffer = ""
+            async with aclosing(
+                self._request(service, content, context, len(pending))
+            ) as stream:
+                async for text_piece in stream:
+                    if not self._is_running or self._batches_cancelled:
+                        return
+                    buffer += text_piece
+                    *lines, buffer = buffer.split("\n")
+                    for line in lines:
+                        accept(line)
+                    for block in flush():
+                        yield block
+            accept(buffer)
+            for block in flush():
+                yield block
+
+            pending = [cue_id for cue_id in cues if cue_id not in received]
+
+        # 多次重试仍缺失的保留原文，避免整条字幕丢失
+        if pending:
+            self.logger.warning(
+                f"结构化翻译仍缺失 {len(pending)} 条，保留原文: {self.task.input_file}"
+            )
+            for cue_id in pending:
+                received[cue_id] = cues[cue_id][2]
+        for block in flush():
+            yield block
+
+    def _with_glossary(self, template):
+        """把术语译名加在 Prompt 模板前，要求各集译名保持一致"""
+        if not self.task.glossary:
+            return template
+        terms = "\n".join(
+            f"{source} → {target}" for source, target in self.task.glossary.items()
+        )
+        terms = terms.replace("{", "{{").replace("}", "}}")
+        return (
+            f"以下人名与专有名词在本系列各集中反复出现，请在译文中始终使用对应的译名：\n"
+            f"{terms}\n\n{template}"
+        )
+
+    def _settings_parts(self):
+        return [
+            self.task.AI,
+            self.task.deepseek_model if self.task.AI == "deepseek" else "",
+            self.task.origin_lang,
+            self.task.target_lang,
+            self.prompt_template,
+        ]
+
+    def _get_manifest_key(self):
+        """原文、模型与 Prompt 都不变时才能接着上次的输出继续"""
+        parts = [self.task.raw_content, *self._settings_parts()]
+        return hashlib.sha1("\0".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+    def _get_settings_key(self):
+        """模型、语言与 Prompt 都不变时才沿用上次的译文"""
+        parts = self._settings_parts()
+        return hashlib.sha1("\0".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+    def _manifest_path(self):
+        return self.task.output_file + MANIFEST_SUFFIX
+
+    def _load_manifest(self, key, total_chunks):
+        """读取断点记录，返回 (已完成的字幕块数, 已完成部分的译文)，无法续翻时返回 (0, "")"""
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if (
+                manifest.get("version") != MANIFEST_VERSION
+                or manifest.get("key") != key
+                or not 0 < manifest["completed"] < total_chunks
+            ):
+                return 0, ""
+            with open(self.task.output_file, "rb") as f:
+                data = f.read(manifest["offset"] + 1)
+            if len(data) < manifest["offset"]:
+                return 0, ""
+            return manifest["completed"], data[: manifest["offset"]].decode("utf-8")
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0, ""
+
+    def _save_manifest(self, key, completed, file_handle):
+        """记录已完整写入的字幕块数及其在输出文件中的位置"""
+        self._flush_output(file_handle)
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "key": key,
+            "completed": completed,
+            "offset": file_handle.tell(),
+        }
+        path = self._manifest_path()
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            self.logger.warning(f"保存翻译进度失败: {e}")
+
+    def _remove_manifest(self):
+        try:
+            os.remove(self._manifest_path())
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"删除翻译进度记录失败: {e}")
+
+    def _snapshot_path(self):
+        return self.task.output_file + SNAPSHOT_SUFFIX
+
+    def _save_snapshot(self):
+        """记下本次译文对应的原文，下次原文改动后只翻译改动的部分"""
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "key": self._get_settings_key(),
+            "source": self.task.raw_content,
+        }
+        path = self._snapshot_path()
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            self.logger.warning(f"保存原文快照失败: {e}")
+
+    def _remove_snapshot(self):
+        try:
+            os.remove(self._snapshot_path())
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"删除原文快照失败: {e}")
+
+    def _create_service(self, service_cls):
+        if service_cls is DeepseekService:
+            return service_cls(self.task)
+        return service_cls()
+
+    def _stream_batch(self, service, chunks, indices, context):
+        if self.structured:
+            return self._stream_structured(service, chunks, indices, context)
+        remote = [i for i in indices if i not in self.local_cues]
+        stream = self._request(
+            service, "\n\n".join(chunks[i] for i in remote), context, len(remote)
+        )
+        if len(remote) == len(indices):
+            return stream
+        return self._splice_local_cues(stream, chunks, indices)
+
+    async def _splice_local_cues(self, stream, chunks, indices):
+        """按字幕块接收译文，根据序号在对应位置插入本地处理的字幕"""
+        positions = {}
+        for i in indices:
+            cue = parse_srt_block(chunks[i])
+            if cue and i not in self.local_cues:
+                positions.setdefault(cue[0], i)
+        local = deque(i for i in indices if i in self.local_cues)
+        first = True
+
+        def emit(block):
+            nonlocal first
+            cue = parse_srt_block(block)
+            position = positions.get(cue[0]) if cue else None
+            items = []
+            if position is not None:
+                while local and local[0] < position:
+                    items.append(_LocalCue(local.popleft()))
+                self._translations[position] = cue[2]
+            items.append(block)
+            for item in items:
+                if not first:
+                    yield "\n\n"
+                first = False
+                yield item
+
+        buffer = ""
+        async with aclosing(stream):
+            async for text_piece in stream:
+                buffer += text_piece
+                *blocks, buffer = re.split(r"\n\s*\n", buffer)
+                for block in blocks:
+                    if block.strip():
+                        for item in emit(block.strip("\n")):
+                            yield item
+        if buffer.strip():
+            for item in emit(buffer.strip("\n")):
+                yield item
+        # 未能按序号对应的本地字幕放在批次末尾
+        while local:
+            if not first:
+                yield "\n\n"
+            first = False
+            yield _LocalCue(local.popleft())
+
+    async def _request(self, service, content, context, cues):
+        """发起一次翻译请求，先等待该服务商每分钟请求数的限额，并记录用量与耗时"""
+        await service.get_rate_limiter().acquire(
+            cfg.get(cfg.translateRequestsPerMinute)
+        )
+        metrics = BatchMetrics(model=service.get_model_name(), cues=cues)
+        output = []
+        started = time.monotonic()
+
+        async def timed_stream():
+            stream = service.translate(
+                self.task.origin_lang,
+                self.task.target_lang,
+                content,
+                self.task.temperature,
+                context,
+                self.request_template,
+                metrics=metrics,
+            )
+            async with aclosing(stream):
+                async for piece in stream:
+                    if metrics.first_chunk_ms is None:
+                        metrics.first_chunk_ms = (time.monotonic() - started) * 1000
+                    metrics.chunks += 1
+                    output.append(piece)
+                    yield piece
+
+        try:
+            async with aclosing(filter_thinking(timed_stream())) as stream:
+                async for text_piece in stream:
+                    yield text_piece
+            metrics.success = True
+        finally:
+            metrics.duration_ms = (time.monotonic() - started) * 1000
+            if metrics.estimated:
+                metrics.completion_tokens = estimate_tokens("".join(output))
+            self._record_metrics(metrics)
+
+    def _record_metrics(self, metrics):
+        self.batch_metrics.append(metrics)
+        if self.metrics_store is None:
+            return
+        # 写库放到线程池中，不阻塞事件循环
+        asyncio.get_running_loop().run_in_executor(None, self._store_metrics, metrics)
+
+    def _store_metrics(self, metrics):
+        try:
+            self.metrics_store.record(self.task.input_file, metrics)
+        except sqlite3.Error as e:
+            self.logger.warning(f"写入用量统计失败: {e}")
+
+    async def _summarize_metrics(self):
+        """汇总本任务的用量，并附上各模型近期的平均表现供比较"""
+        self.task.metrics_summary = summarize_batches(self.batch_metrics)
+        if self.task.metrics_summary:
+            self.logger.info(
+                f"翻译用量: {self.task.input_file} - {self.task.metrics_summary}"
+            )
+        if self.metrics_store is None:
+            return
+        try:
+            rows = await asyncio.to_thread(self.metrics_store.model_summary)
+        except sqlite3.Error as e:
+            self.logger.warning(f"读取用量统计失败: {e}")
+            return
+        lines = ["近 30 天各模型平均："]
+        for (
+            model,
+            count,
+            first_chunk_ms,
+            chunks_per_sec,
+            tokens_per_cue,
+            failure,
+        ) in rows:
+            lines.append(
+                f"{model}: {count} 次请求，首字 {(first_chunk_ms or 0) / 1000:.1f}s，"
+                f"{chunks_per_sec or 0:.1f} 块/秒，每条字幕 {tokens_per_cue or 0:.0f} tokens，"
+                f"失败率 {failure or 0:.0%}"
+            )
+        self.task.metrics_detail = "\n".join(lines)
+
+    async def _translate_batch(self, services, chunks, indices, context, batch_queue):
+        """翻译一个批次，译文片段依次放入该批次的队列
+
+        临时性错误按指数退避重试，仍然失败时切换到备用模型
+        """
+        max_retries = cfg.get(cfg.translateMaxRetries)
+        error = None
+        for service_index, service in enumerate(services):
+            if service_index:
+                self.logger.warning(
+                    f"切换到备用模型 {service.get_model_name()}: {self.task.input_file}"
+                )
+                batch_queue.put_nowait(_BatchRestart(service))
+
+            attempt = 0
+            while True:
+                async with service.get_semaphore():
+                    if not self._is_running or self._batches_cancelled:
+                        batch_queue.put_nowait(None)
+                        return
+                    try:
+                        # 取消时 break 也要立即关闭流和底层连接，再释放信号量
+                        async with aclosing(
+                            self._stream_batch(service, chunks, indices, context)
+                        ) as stream:
+                            async for text_piece in stream:
+                                if not self._is_running or self._batches_cancelled:
+                                    break
+                                batch_queue.put_nowait(text_piece)
+                        batch_queue.put_nowait(None)
+                        return
+                    except Exception as e:
+                        error = e
+
+                if attempt >= max_retries or not service.is_retryable_error(error):
+                    break
+                attempt += 1
+                delay = self._get_retry_delay(service, error, attempt)
+                self.logger.warning(
+                    f"批次翻译失败，{delay:.1f} 秒后第 {attempt} 次重试: "
+                    f"{service.analysis_error(str(error))}"
+                )
+                await asyncio.sleep(delay)
+                batch_queue.put_nowait(_BatchRestart(service))
 
-        # 去除思考内容
-        cleaned_content = remove_thinking_content(content)
+        batch_queue.put_nowait(error)
 
-        # 如果内容有变化，重新写入文件
-        if cleaned_content != content:
-            with open(self.task.output_file, "w", encoding="utf-8") as f:
-                f.write(cleaned_content)
-            self.logger.info(f"已去除思考内容，文件已更新: {self.task.output_file}")
-            event_bus.translate_update_signal.emit(str(self.task.id), cleaned_content)
-        else:
-            self.logger.info(f"未检测到思考内容，文件保持不变: {self.task.output_file}")
+    @staticmethod
+    def _get_retry_delay(service, error, attempt):
+        """指数退避加随机抖动；服务端给出 Retry-After 时不早于该时间"""
+        delay = min(RETRY_MAX_DELAY_SEC, RETRY_BASE_DELAY_SEC * 2 ** (attempt - 1))
+        delay *= random.uniform(0.5, 1.0)
+        retry_after = service.get_retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, RETRY_MAX_DELAY_SEC * 2))
+        return delay
 
     def _write_and_notify(self, chunk: str, file_handle):
-        file_handle.write(chunk)
+        """缓存译文片段，按时间片合并后写入文件并通知界面"""
+        self._pending_output.append(chunk)
+        self._flush_output(file_handle, force=False)
+
+    def _flush_output(self, file_handle, force=True):
+        if not self._pending_output:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < OUTPUT_FLUSH_INTERVAL_SEC:
+            return
+        self._last_flush = now
+
+        text = "".join(self._pending_output)
+        self._pending_output.clear()
+        file_handle.write(text)
         file_handle.flush()
-        event_bus.translate_update_signal.emit(str(self.task.id), chunk)
+        self._batch_output.append(text)
+        self._emit(event_bus.translate_update_signal, str(self.task.id), text)
+
+    def _rewind_output(self, file_handle, position):
+        """批次重试时把输出文件和预览回退到批次开始处"""
+        self._pending_output.clear()
+        file_handle.seek(position)
+        file_handle.truncate()
+        # 预览按文本撤回，不按字符数定位：界面文档的位置与 Python 字符数并不一致
+        discarded = "".join(self._batch_output)
+        self._batch_output = []
+        self._emit(event_bus.translate_rewind_signal, str(self.task.id), discarded)
 
     def cancel(self):
         self._is_running = False
         self.task.status = "已取消"
+
+
+class GlossaryJob(QObject):
+    """项目批量翻译前统一翻译术语表，各集再共用同一份译名"""
+
+    finished_signal = Signal(object)  # {原文: 译文}，未能翻译的术语不包含在内
+
+    def __init__(self, task: TranslateTask, terms):
+        super().__init__()
+        self.logger = Logger("GlossaryJob", "translate")
+        self.task = task
+        self.terms = terms
+        self._future = None
+
+    def start(self):
+        self._future = translate_engine.submit(self._run())
+
+    def wait(self, timeout=None):
+        """阻塞等待任务结束，供脚本使用"""
+        if self._future is not None:
+            self._future.result(timeout)
+
+    async def _run(self):
+        glossary = {}
+        try:
+            service_cls = TranslateJob.SERVICES.get(self.task.AI)
+            if service_cls is DeepseekService:
+                service = service_cls(self.task)
+            elif service_cls:
+                service = service_cls()
+            else:
+                raise ValueError(f"不支持的AI模型: {self.task.AI}")
+
+            memory_key = (
+                self.task.origin_lang,
+                self.task.target_lang,
+                service.get_model_name(),
+                hash_prompt(GLOSSARY_PROMPT_TEMPLATE),
+            )
+            memory = None
+            if cfg.get(cfg.useTranslationMemory):
+                try:
+                    memory = await asyncio.to_thread(TranslationMemory)
+                    found = await asyncio.to_thread(
+                        memory.lookup, self.terms, *memory_key
+                    )
+                except sqlite3.Error as e:
+                    self.logger.warning(f"读取翻译记忆失败: {e}")
+                    memory, found = None, {}
+                for term in self.terms:
+                    if (target := found.get(normalize_source(term))) is not None:
+                        glossary[term] = target
+
+            # 只请求翻译记忆中没有的术语，已确定的译名不会因重新生成而改变
+            missing = [term for term in self.terms if term not in glossary]
+            if missing:
+                await service.get_rate_limiter().acquire(
+                    cfg.get(cfg.translateRequestsPerMinute)
+                )
+                output = []
+                async for piece in filter_thinking(
+                    service.translate(
+                        self.task.origin_lang,
+                        self.task.target_lang,
+                        "\n".join(missing),
+                        self.task.temperature,
+                        template=GLOSSARY_PROMPT_TEMPLATE,
+                    )
+                ):
+                    output.append(piece)
+
+                resolved = {}
+                for line in "".join(output).splitlines():
+                    match = GLOSSARY_RECORD_PATTERN.match(line)
+                    if match and match.group(1) in missing:
+                        resolved[match.group(1)] = match.group(2)
+                glossary.update(resolved)
+                if memory is not None and resolved:
+                    try:
+                        await asyncio.to_thread(
+                            memory.store, list(resolved.items()), *memory_key
+                        )
+                    except sqlite3.Error as e:
+                        self.logger.warning(f"写入翻译记忆失败: {e}")
+        except Exception as e:
+            error_msg = BaseTranslateService.analysis_error(str(e))
+            self.logger.error(f"术语表翻译失败，各集将不使用术语表: {error_msg}")
+        glossary = {term: glossary[term] for term in self.terms if term in glossary}
+        signal_bridge.post(self.finished_signal, glossary)
@@ -0,0 +1,126 @@
+# coding:utf-8
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+
+from ..common.setting import DB_PATH
+
+
+def normalize_source(text: str) -> str:
+    """规范化原文：统一全半角、合并空白，作为翻译记忆的键"""
+    text = unicodedata.normalize("NFKC", text)
+    lines = [re.sub(r"\s+", " ", line).strip() for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def hash_prompt(prompt_template: str) -> str:
+    return hashlib.sha1(prompt_template.encode("utf-8")).hexdigest()[:16]
+
+
+class TranslationMemory:
+    """翻译记忆：按 原文 + 语言对 + 模型 + Prompt 缓存单条字幕的译文"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS translation_memory (
+                    source TEXT NOT NULL,
+                    origin_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_hash TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    updated_at INTEGER NOT NULL,
+                    PRIMARY KEY (source, origin_lang, target_lang, model, prompt_hash)
+                )
+                """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, sources, origin_lang, target_lang, model, prompt_hash):
+        """批量查询，返回 {规范化原文: 译文}"""
+        keys = list({normalize_source(s) for s in sources} - {""})
+        if not keys:
+            return {}
+
+        found = {}
+        with self._lock, self._connect() as conn:
+            # SQLite 默认最多 999 个参数，分批查询
+            for i in range(0, len(keys), 500):
+                part = keys[i : i + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = conn.execute(
+                    f"""
+                    SELECT source, translation FROM translation_memory
+                    WHERE origin_lang = ? AND target_lang = ? AND model = ?
+                        AND prompt_hash = ? AND source IN ({placeholders})
+                    """,
+                    (origin_lang, target_lang, model, prompt_hash, *part),
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                conn.executemany(
+                    """
+                    UPDATE translation_memory SET hits = hits + 1
+                    WHERE source = ? AND origin_lang = ? AND target_lang = ?
+                        AND model = ? AND prompt_hash = ?
+                    """,
+                    [
+                        (source, origin_lang, target_lang, model, prompt_hash)
+                        for source in found
+                    ],
+                )
+        return found
+
+    def store(self, pairs, origin_lang, target_lang, model, prompt_hash):
+        """保存 [(原文, 译文)]，已存在的条目会被覆盖"""
+        now = int(time.time())
+        rows = []
+        for source, translation in pairs:
+            source = normalize_source(source)
+            translation = translation.strip()
+            if source and translation:
+                rows.append(
+                    (
+                        source,
+                        origin_lang,
+                        target_lang,
+                        model,
+                        prompt_hash,
+                        translation,
+                        now,
+                    )
+                )
+        if not rows:
+            return
+
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO translation_memory
+                    (source, origin_lang, target_lang, model, prompt_hash, translation, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, origin_lang, target_lang, model, prompt_hash)
+                DO UPDATE SET translation = excluded.translation,
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
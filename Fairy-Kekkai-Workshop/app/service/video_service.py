@@ -3,7 +3,7 @@
 import math
 
 import cv2
-from PySide6.QtCore import QRect, Qt, Signal
+from PySide6.QtCore import QRect, Qt, QThread, Signal
 from PySide6.QtGui import QColor, QImage, QPainter, QPen, QPixmap
 from PySide6.QtWidgets import (
     QHBoxLayout,
@@ -19,6 +19,36 @@ from qfluentwidgets import (
 )
 
 from ..common.config import cfg
+from .CLI.videocr.frame_index import FrameIndex
+
+
+def load_frame_index(video_path, build=False):
+    """读取视频旁的帧索引文件，返回每帧相对视频开头的毫秒时间；不存在或已过期时返回 None
+
+    build 为 True 时在索引缺失或过期时扫描视频重新生成
+    """
+    if build:
+        index = FrameIndex.load_or_build(video_path)
+    else:
+        index = FrameIndex.load(video_path)
+    if index is None:
+        return None
+    return index.ms - index.start_time_ms
+
+
+class FrameIndexThread(QThread):
+    """在后台扫描视频生成帧索引，避免预览加载时卡住界面"""
+
+    finished_signal = Signal(str, object)  # 视频路径, 每帧毫秒时间（失败时为 None）
+
+    def __init__(self, video_path):
+        super().__init__()
+        self.video_path = video_path
+
+    def run(self):
+        self.finished_signal.emit(
+            self.video_path, load_frame_index(self.video_path, build=True)
+        )
 
 
 class VideoPreview(SimpleCardWidget):
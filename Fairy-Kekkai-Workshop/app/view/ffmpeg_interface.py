@@ -68,10 +68,11 @@ class FFmpegInterface(BaseFunctionInterface):
         args["output_path"] = self.outputFileCard.lineEdit.text()
         return args
 
-    def addFFmpegTaskFromProject(self, file_path, output_path):
+    def addFFmpegTaskFromProject(self, file_path, output_path, subtitle_path=""):
         """从项目界面添加压制任务"""
         args = {}
         args["video_path"] = file_path
         args["output_path"] = output_path
+        args["subtitle_path"] = subtitle_path
 
         self.addTask.emit(args)
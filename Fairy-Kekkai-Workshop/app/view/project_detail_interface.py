@@ -44,6 +44,57 @@ from ..components.dialog import (
 )
 from ..components.pager import Pager
 from ..service.project_service import project
+from ..service.srt_service import (
+    PROJECT_STYLE_FILE,
+    AssTemplate,
+    build_bilingual_subtitle,
+    convert_srt_to_ass,
+    load_project_template,
+    save_ass_template,
+)
+
+
+class ConvertAssThread(QThread):
+    """按项目的样式模板把各集字幕批量转换为 ASS"""
+
+    finished = Signal(int, list)  # 转换的集数, 失败信息
+
+    def __init__(self, project_path, subfolders, bilingual):
+        super().__init__()
+        self.project_path = project_path
+        self.subfolders = subfolders
+        self.bilingual = bilingual
+
+    def run(self):
+        errors = []
+        template_path = Path(self.project_path) / PROJECT_STYLE_FILE
+        try:
+            # 首次转换时写出默认样式，之后修改该文件即可统一调整各集样式
+            if not template_path.exists():
+                save_ass_template(template_path, AssTemplate())
+            template = load_project_template(self.project_path)
+        except (OSError, ValueError) as e:
+            errors.append(f"读取样式模板失败: {e}")
+            template = AssTemplate()
+
+        converted = 0
+        for folder_num, folder_path in self.subfolders:
+            folder = Path(folder_path)
+            translated = folder / "译文.srt"
+            original = folder / "原文.srt"
+            if not translated.exists():
+                continue
+            try:
+                if self.bilingual and original.exists():
+                    build_bilingual_subtitle(
+                        original, translated, folder / "双语.ass", template
+                    )
+                else:
+                    convert_srt_to_ass(translated, folder / "译文.ass", template)
+                converted += 1
+            except (OSError, ValueError) as e:
+                errors.append(f"第 {folder_num} 集: {e}")
+        self.finished.emit(converted, errors)
 
 
 class LoadProjectThread(QThread):
@@ -222,6 +273,18 @@ class ProjectDetailInterface(ScrollArea):
             )
         )
 
+        # 创建批量翻译按钮
+        translateAllButton = PushButton(FIF.LANGUAGE, "翻译全部字幕", self.view)
+        translateAllButton.setToolTip("翻译所有已有原文但没有译文的集数，各集共用术语表")
+        translateAllButton.clicked.connect(self.translateProject)
+
+        # 创建批量转换ASS按钮
+        convertAssButton = PushButton(FIF.FONT, "生成全部ASS字幕", self.view)
+        convertAssButton.setToolTip(
+            f"按项目文件夹中的 {PROJECT_STYLE_FILE} 把各集译文转换为 ASS，不存在时创建默认样式"
+        )
+        convertAssButton.clicked.connect(self.convertProjectToAss)
+
         # 创建项目标题
         projectTitle = TitleLabel(
             os.path.basename(self.current_project_path), self.view
@@ -284,6 +347,8 @@ class ProjectDetailInterface(ScrollArea):
         # 设置布局
         self.vBoxLayout.addWidget(backButton)
         self.vBoxLayout.addWidget(refreshButton)
+        self.vBoxLayout.addWidget(translateAllButton)
+        self.vBoxLayout.addWidget(convertAssButton)
         self.vBoxLayout.addWidget(projectTitle)
         self.vBoxLayout.addWidget(page_info_label)
 
@@ -408,6 +473,49 @@ class ProjectDetailInterface(ScrollArea):
 
         parent_layout.addWidget(fileListWidget)
 
+    def translateProject(self):
+        """批量翻译本项目所有已有原文但没有译文的集数"""
+        episodes = []
+        for _, folder_path in self.subfolders:
+            source = Path(folder_path) / "原文.srt"
+            target = Path(folder_path) / "译文.srt"
+            if source.exists() and not target.exists():
+                episodes.append((str(source), str(target)))
+
+        if not episodes:
+            event_bus.notification_service.show_info("提示", "没有需要翻译的字幕")
+            return
+
+        event_bus.translate_project_requested.emit(episodes)
+        event_bus.notification_service.show_info(
+            "成功", f"已添加 {len(episodes)} 个翻译任务"
+        )
+
+    def convertProjectToAss(self):
+        """批量把本项目各集字幕转换为 ASS，双语模式下合并原文与译文"""
+        if hasattr(self, "convert_thread") and self.convert_thread.isRunning():
+            return
+        self.convert_thread = ConvertAssThread(
+            self.current_project_path,
+            self.subfolders,
+            cfg.get(cfg.ffmpegSubtitleMode) != "translated",
+        )
+        self.convert_thread.finished.connect(self.on_convert_finished)
+        self.convert_thread.start()
+
+    def on_convert_finished(self, converted, errors):
+        self.convert_thread.finished.disconnect(self.on_convert_finished)
+        del self.convert_thread
+        if errors:
+            event_bus.notification_service.show_error("错误", "\n".join(errors[:3]))
+        if converted:
+            event_bus.notification_service.show_success(
+                "成功", f"已生成 {converted} 集 ASS 字幕"
+            )
+            self.delayedRefreshProject()
+        elif not errors:
+            event_bus.notification_service.show_info("提示", "没有可转换的译文字幕")
+
     def on_pips_page_changed(self, index):
         """PipsPager分页改变时的处理"""
         self.current_page = index + 1  # PipsPager索引从0开始，我们内部从1开始
@@ -738,6 +846,14 @@ class FileItemWidget(SimpleCardWidget):
             self.translateBtn.clicked.connect(self.translateSubtitle)
             buttonLayout.addWidget(self.translateBtn)
 
+        # 压制字幕按钮 (当有生肉.mp4和译文.srt时显示)
+        if self.translate_need and self.file_exists and self.other_exists[1]:
+            self.burnBtn = TransparentToolButton(FIF.FONT, self)
+            self.burnBtn.setToolTip("压制字幕")
+            self.burnBtn.setFixedSize(32, 32)
+            self.burnBtn.clicked.connect(self.burnSubtitle)
+            buttonLayout.addWidget(self.burnBtn)
+
         # 视频压制按钮 (当有熟肉.mp4时显示)
         if self.ffmpeg_need and self.other_exists[2]:
             self.ffmpegBtn = TransparentToolButton(FIF.VIDEO, self)
@@ -925,7 +1041,36 @@ class FileItemWidget(SimpleCardWidget):
         else:
             file_path = output_file.parent / f"{output_file.stem}_.mp4"
 
-        event_bus.ffmpeg_requested.emit(str(output_file), str(file_path))
+        event_bus.ffmpeg_requested.emit(str(output_file), str(file_path), "")
+
+    def burnSubtitle(self):
+        """把译文（或原文与译文合并的双语字幕）烧录到生肉视频，输出熟肉.mp4"""
+        folder = Path(self.file_path).parent
+        subtitle_path = Path(self.file_path)
+        mode = cfg.get(cfg.ffmpegSubtitleMode)
+        if mode != "translated" and (folder / "原文.srt").exists():
+            subtitle_path = folder / (
+                "双语.ass" if mode == "bilingual_ass" else "双语.srt"
+            )
+            try:
+                build_bilingual_subtitle(
+                    folder / "原文.srt",
+                    self.file_path,
+                    subtitle_path,
+                    load_project_template(folder.parent),
+                )
+            except (OSError, ValueError) as e:
+                event_bus.notification_service.show_error(
+                    "错误", f"生成双语字幕失败: {str(e)}"
+                )
+                return
+
+        event_bus.ffmpeg_requested.emit(
+            str(folder / "生肉.mp4"), str(folder / "熟肉.mp4"), str(subtitle_path)
+        )
+        event_bus.notification_service.show_info(
+            "成功", f"已添加第 {self.folder_num} 集字幕压制任务"
+        )
 
 
 class FileListWidget(QWidget):
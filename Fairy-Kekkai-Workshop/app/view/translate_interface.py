@@ -19,6 +19,7 @@ from ..common.setting import AI_model_dict, translate_language_dict
 from ..components.base_function_interface import BaseFunctionInterface
 from ..components.base_stacked_interface import BaseStackedInterfaces
 from ..components.config_card import TranslateSettingInterface
+from ..service.glossary_service import extract_glossary
 from ..service.srt_service import Srt
 
 
@@ -46,6 +47,7 @@ class TranslationInterface(BaseFunctionInterface):
 
     def __init__(self, parent=None):
         self.file_srt = None
+        self.glossary_jobs = set()
         super().__init__(parent, "翻译")
 
         self.file_extension = "*.srt"
@@ -156,6 +158,7 @@ class TranslationInterface(BaseFunctionInterface):
         """连接信号槽"""
         super()._connect_signals()
         event_bus.translate_requested.connect(self.addTranslateFromProject)
+        event_bus.translate_project_requested.connect(self.addTranslateProject)
 
     def load_file_content(self, file_path):
         """加载SRT文件内容"""
@@ -230,12 +233,19 @@ class TranslationInterface(BaseFunctionInterface):
 
     def _get_args(self):
         """获取翻译参数"""
+        return self._build_args(
+            str(self.file_srt.file_path),
+            self.outputFileCard.lineEdit.text(),
+            self.file_srt.raw_content,
+        )
+
+    def _build_args(self, srt_path, output_path, raw_content):
         args = {}
-        args["srt_path"] = str(self.file_srt.file_path)
-        args["output_path"] = self.outputFileCard.lineEdit.text()
+        args["srt_path"] = srt_path
+        args["output_path"] = output_path
         args["origin_lang"] = cfg.get(cfg.origin_lang)
         args["target_lang"] = cfg.get(cfg.target_lang)
-        args["raw_content"] = self.file_srt.raw_content
+        args["raw_content"] = raw_content
         args["AI"] = AI_model_dict.get(cfg.get(cfg.ai_model), "glm-4.5-flash")
         args["temperature"] = float(cfg.get(cfg.aiTemperature))
 
@@ -267,11 +277,51 @@ class TranslationInterface(BaseFunctionInterface):
         srt_file = Srt(file_path)
         self.file_srt = srt_file
 
-        args = {}
-        args["srt_path"] = file_path
-        args["output_path"] = output_path
-        args["origin_lang"] = cfg.get(cfg.origin_lang)
-        args["target_lang"] = cfg.get(cfg.target_lang)
-        args["raw_content"] = srt_file.raw_content
-
+        args = self._build_args(file_path, output_path, srt_file.raw_content)
         self.addTask.emit(args)
+
+    def addTranslateProject(self, episodes):
+        """从项目界面批量添加翻译任务，各集共用从全部原文中提取并统一翻译的术语表"""
+        # [(原文路径, 输出路径, 原文内容)]，原文每集只读取一次
+        srt_files = []
+        for file_path, output_path in episodes:
+            try:
+                srt_files.append(
+                    (str(file_path), output_path, Srt(file_path).raw_content)
+                )
+            except Exception as e:
+                self.logger.error(f"读取字幕失败，已跳过: {file_path} - {e}")
+        if not srt_files:
+            return
+        terms = extract_glossary([raw_content for _, _, raw_content in srt_files])
+        if not terms:
+            self._addProjectTasks(srt_files, {})
+            return
+
+        from ..service.translate_service import GlossaryJob, TranslateTask
+
+        # 先统一确定术语译名，再分发到各集，避免各集各自翻译出不同的译名
+        job = GlossaryJob(TranslateTask(self._build_args(*srt_files[0])), terms)
+        job.finished_signal.connect(
+            lambda glossary: self._onGlossaryFinished(job, srt_files, glossary)
+        )
+        # 多个项目可能同时在确定术语表，任务结束前保持引用
+        self.glossary_jobs.add(job)
+        job.start()
+
+    def _onGlossaryFinished(self, job, srt_files, glossary):
+        self.glossary_jobs.discard(job)
+        self._addProjectTasks(srt_files, glossary)
+
+    def _addProjectTasks(self, srt_files, glossary):
+        """术语表确定后添加各集翻译任务"""
+        if glossary:
+            pairs = "、".join(
+                f"{source}→{target}" for source, target in glossary.items()
+            )
+            self.logger.info(f"项目术语表({len(glossary)}): {pairs}")
+
+        for file_path, output_path, raw_content in srt_files:
+            args = self._build_args(file_path, output_path, raw_content)
+            args["glossary"] = glossary
+            self.addTask.emit(args)
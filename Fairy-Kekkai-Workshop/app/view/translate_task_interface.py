@@ -3,10 +3,11 @@
 
 from PySide6.QtCore import Signal
 
+from ..common.config import cfg
 from ..common.event_bus import event_bus
 from ..components.base_task_interface import BaseTaskInterface
 from ..components.task_card import TranslateItemWidget
-from ..service.translate_service import TranslateTask, TranslateThread
+from ..service.translate_service import TranslateJob, TranslateTask
 
 
 class TranslateTaskInterface(BaseTaskInterface):
@@ -21,8 +22,11 @@ class TranslateTaskInterface(BaseTaskInterface):
             object_name="translateTaskInterface",
             processing_text="翻译中",
             task_type="翻译",
+            max_concurrent_tasks=cfg.get(cfg.concurrentTranslateJobs),
             parent=parent,
         )
+        # 监听配置变化，更新最大并发数
+        cfg.concurrentTranslateJobs.valueChanged.connect(self._updateMaxConcurrentTasks)
 
         self.translate_paths = []  # 所有待翻译文件路径
 
@@ -45,7 +49,7 @@ class TranslateTaskInterface(BaseTaskInterface):
         )
 
     def createTaskThread(self, task: TranslateTask):
-        return TranslateThread(task)
+        return TranslateJob(task)
 
     def getTaskPath(self, task: TranslateTask):
         return task.input_file
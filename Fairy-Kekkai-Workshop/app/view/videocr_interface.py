@@ -6,6 +6,7 @@ import os
 import re
 
 import cv2
+import numpy as np
 from PySide6.QtCore import Qt, QTime
 from PySide6.QtWidgets import (
     QHBoxLayout,
@@ -34,7 +35,11 @@ from ..common.setting import (
 from ..components.base_function_interface import BaseFunctionInterface
 from ..components.base_stacked_interface import BaseStackedInterfaces
 from ..components.config_card import OCRSettingInterface
-from ..service.video_service import VideoPreview
+from ..service.video_service import (
+    FrameIndexThread,
+    VideoPreview,
+    load_frame_index,
+)
 from ..view.videocr_task_interface import OcrTaskInterface
 
 
@@ -76,6 +81,9 @@ class VideocrInterface(BaseFunctionInterface):
         self.current_frame = 0
         self.total_frames = 0
         self.fps = 0
+        self.frame_times_ms = None
+        self.video_path = None
+        self.frame_index_threads = []  # 切换视频时旧的扫描可能还未结束
         self.video_preview = None
 
         super().__init__(parent, "提取字幕")
@@ -193,13 +201,15 @@ class VideocrInterface(BaseFunctionInterface):
             if not self.video_capture.isOpened():
                 raise Exception("无法打开视频文件")
 
-            self.total_frames = int(self.video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
-            self.fps = self.video_capture.get(cv2.CAP_PROP_FPS)
+            self.video_path = video_path
             self.current_frame = 0
 
-            # 设置进度条
-            self.progress_slider.setRange(0, self.total_frames - 1)
-            self.progress_slider.setEnabled(True)
+            # 优先使用提取字幕时生成的帧索引，得到精确的帧数和时间戳
+            frame_times_ms = load_frame_index(video_path)
+            if frame_times_ms is None:
+                # 索引缺失时在后台生成，期间先使用 OpenCV 估算的帧数
+                self._build_frame_index(video_path)
+            self._apply_frame_index(frame_times_ms)
 
             # 显示第一帧
             self._update_video_frame(0)
@@ -214,10 +224,67 @@ class VideocrInterface(BaseFunctionInterface):
         except Exception as e:
             self._log_message(f"加载视频失败: {str(e)}", is_error=True)
 
+    def _apply_frame_index(self, frame_times_ms):
+        """根据帧索引（为 None 时使用 OpenCV 的估算值）设置帧数、帧率和进度条"""
+        if frame_times_ms is not None and len(frame_times_ms) > 1:
+            self.frame_times_ms = frame_times_ms
+            self.total_frames = len(frame_times_ms)
+            self.fps = (
+                (self.total_frames - 1)
+                * 1000.0
+                / (frame_times_ms[-1] - frame_times_ms[0])
+            )
+        else:
+            self.frame_times_ms = None
+            self.total_frames = int(self.video_capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            self.fps = self.video_capture.get(cv2.CAP_PROP_FPS)
+
+        self.progress_slider.setRange(0, self.total_frames - 1)
+        self.progress_slider.setEnabled(True)
+
+    def _build_frame_index(self, video_path):
+        """后台扫描视频生成帧索引"""
+        thread = FrameIndexThread(video_path)
+        thread.finished_signal.connect(self._on_frame_index_built)
+        thread.finished.connect(lambda: self.frame_index_threads.remove(thread))
+        self.frame_index_threads.append(thread)
+        thread.start()
+
+    def _on_frame_index_built(self, video_path, frame_times_ms):
+        """帧索引生成完成，切换为按时间戳精确定位"""
+        if video_path != self.video_path or frame_times_ms is None:
+            return
+        # 保持当前画面所在的时间不变
+        current_ms = self._frame_time_ms(self.current_frame)
+        self._apply_frame_index(frame_times_ms)
+        if self.frame_times_ms is None:
+            return
+        frame_number = int(np.searchsorted(self.frame_times_ms, current_ms))
+        frame_number = min(frame_number, self.total_frames - 1)
+        self.progress_slider.blockSignals(True)
+        self.progress_slider.setValue(frame_number)
+        self.progress_slider.blockSignals(False)
+        self._update_video_frame(frame_number)
+        self._log_message(f"帧索引已生成，总帧数: {self.total_frames}")
+
+    def _frame_time_ms(self, frame_number):
+        """帧号对应的毫秒时间"""
+        if self.frame_times_ms is not None:
+            return float(self.frame_times_ms[frame_number])
+        if self.fps > 0:
+            return frame_number * 1000.0 / self.fps
+        return 0.0
+
     def _update_video_frame(self, frame_number):
         """更新视频帧显示"""
         if self.video_capture and 0 <= frame_number < self.total_frames:
-            self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            if self.frame_times_ms is not None:
+                # 按帧索引中的真实时间戳定位，可变帧率视频也不会错位
+                self.video_capture.set(
+                    cv2.CAP_PROP_POS_MSEC, self._frame_time_ms(frame_number)
+                )
+            else:
+                self.video_capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
             ret, frame = self.video_capture.read()
 
             if ret:
@@ -226,7 +293,13 @@ class VideocrInterface(BaseFunctionInterface):
 
                 # 更新帧和时间信息
                 self.frame_label.setText(f"帧: {frame_number + 1}/{self.total_frames}")
-                if self.fps > 0:
+                if self.frame_times_ms is not None:
+                    current_time = self.frame_times_ms[frame_number] / 1000.0
+                    total_time = (self.frame_times_ms[-1] + 1000.0 / self.fps) / 1000.0
+                    self.time_label.setText(
+                        f"时间: {self._format_time(current_time)}/{self._format_time(total_time)}"
+                    )
+                elif self.fps > 0:
                     current_time = frame_number / self.fps
                     total_time = self.total_frames / self.fps
                     self.time_label.setText(
@@ -369,6 +442,7 @@ class VideocrInterface(BaseFunctionInterface):
         args["ocr_image_max_width"] = cfg.get(cfg.ocrImageMaxWidth)
         args["post_processing"] = cfg.get(cfg.postProcessing)
         args["min_subtitle_duration_sec"] = cfg.get(cfg.minSubtitleDuration)
+        args["memory_limit_mb"] = cfg.get(cfg.ocrMemoryLimit)
         args["gpu_env"] = cfg.get(cfg.gpuEnv)
         args["paddleocr_path"] = cfg.get(cfg.paddleocrPath)
         args["supportFilesPath"] = cfg.get(cfg.supportFilesPath)
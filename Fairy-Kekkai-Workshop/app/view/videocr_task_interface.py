@@ -2,6 +2,7 @@
 
 from PySide6.QtCore import Signal
 
+from ..common.config import cfg
 from ..components.base_task_interface import BaseTaskInterface
 from ..components.task_card import OcrItemWidget
 from ..service.ocr_service import OCRProcess, OCRTask
@@ -17,8 +18,11 @@ class OcrTaskInterface(BaseTaskInterface):
             object_name="ocrTaskInterface",
             processing_text="提取中",
             task_type="提取",
+            max_concurrent_tasks=cfg.get(cfg.concurrentOcrJobs),
             parent=parent,
         )
+        # 监听配置变化，更新最大并发数
+        cfg.concurrentOcrJobs.valueChanged.connect(self._updateMaxConcurrentTasks)
 
     def createTask(self, args):
         return OCRTask(args)
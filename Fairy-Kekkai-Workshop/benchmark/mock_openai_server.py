@@ -0,0 +1,261 @@
+# coding:utf-8
+"""OpenAI 兼容的本地模拟服务，无需 API Key 和网络即可测试、压测翻译流程
+
+    python -m benchmark.mock_openai_server --port 8765 --latency 0.5 --token-rate 50
+
+在设置中启用自定义模型，API基础URL 填 http://127.0.0.1:8765/v1，任意 API Key 即可。
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_MARKER = "待翻译内容："
+STRUCTURED_RECORD = re.compile(r"^(\s*\d+\s*\|)(.*)$")
+SRT_TIMING = re.compile(r"-->")
+
+
+@dataclass
+class MockConfig:
+    model: str = "mock-model"
+    # 首个分块之前的等待（秒）
+    latency: float = 0.3
+    # 每秒输出的分块数，0 表示不限速
+    token_rate: float = 50
+    # 每个分块的字符数
+    chunk_chars: int = 2
+    # 随机返回 500/503 的概率
+    error_rate: float = 0.0
+    # 每分钟请求数上限，超过时返回 429 和 Retry-After，0 表示不限制
+    rpm: int = 0
+
+
+def mock_translate(prompt: str) -> str:
+    """模拟译文：保留序号、时间轴和「编号|」前缀，只给字幕文本加上标记"""
+    content = prompt.rsplit(CONTENT_MARKER, 1)[-1].strip("\n")
+    lines = []
+    for line in content.split("\n"):
+        match = STRUCTURED_RECORD.match(line)
+        if match:
+            lines.append(f"{match.group(1)}[译]{match.group(2)}")
+        elif not line.strip() or line.strip().isdigit() or SRT_TIMING.search(line):
+            lines.append(line)
+        else:
+            lines.append(f"[译]{line}")
+    return "\n".join(lines)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server: "MockOpenAIServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(
+                200,
+                {
+                    "object": "list",
+                    "data": [{"id": self.server.config.model, "object": "model"}],
+                },
+            )
+        else:
+            self._send_error(404, "not_found", "Not found")
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_error(404, "not_found", "Not found")
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_error(400, "invalid_request_error", "Invalid JSON body")
+            return
+
+        config = self.server.config
+        retry_after = self.server.check_rate_limit()
+        if retry_after is not None:
+            self._send_error(
+                429,
+                "rate_limit_exceeded",
+                "Rate limit reached for requests",
+                {"Retry-After": str(max(1, round(retry_after)))},
+            )
+            return
+        if config.error_rate and random.random() < config.error_rate:
+            status = random.choice([500, 503])
+            self._send_error(status, "server_error", "The server is overloaded")
+            return
+
+        prompt = "\n".join(
+            message.get("content", "") for message in body.get("messages", [])
+        )
+        text = mock_translate(prompt)
+        usage = {
+            "prompt_tokens": len(prompt) // 2 + 1,
+            "completion_tokens": len(text) // 2 + 1,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        time.sleep(config.latency)
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage")
+            self._stream(text, usage if include_usage else None)
+        else:
+            self._send_json(
+                200,
+                {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": config.model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": text},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": usage,
+                },
+            )
+
+    def _stream(self, text, usage):
+        config = self.server.config
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        interval = 1 / config.token_rate if config.token_rate > 0 else 0
+        size = max(1, config.chunk_chars)
+        try:
+            for i in range(0, len(text), size):
+                self._send_event(self._chunk({"content": text[i : i + size]}))
+                if interval:
+                    time.sleep(interval)
+            self._send_event(self._chunk({}, finish_reason="stop"))
+            if usage:
+                chunk = self._chunk({})
+                chunk["choices"] = []
+                chunk["usage"] = usage
+                self._send_event(chunk)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端取消了请求
+            pass
+
+    def _chunk(self, delta, finish_reason=None):
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": self.server.config.model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    def _send_event(self, payload):
+        self.wfile.write(
+            f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode()
+        )
+        self.wfile.flush()
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, code, message, headers=None):
+        self._send_json(
+            status,
+            {"error": {"message": message, "type": code, "code": code}},
+            headers,
+        )
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, config: MockConfig = None):
+        super().__init__((host, port), MockHandler)
+        self.config = config or MockConfig()
+        self._requests = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def check_rate_limit(self):
+        """超过每分钟请求数时返回需要等待的秒数，否则记录本次请求并返回 None"""
+        if not self.config.rpm:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            while self._requests and now - self._requests[0] >= 60:
+                self._requests.popleft()
+            if len(self._requests) >= self.config.rpm:
+                return 60 - (now - self._requests[0])
+            self._requests.append(now)
+            return None
+
+    def start_background(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser):
+    defaults = MockConfig()
+    parser.add_argument("--latency", type=float, default=defaults.latency)
+    parser.add_argument("--token-rate", type=float, default=defaults.token_rate)
+    parser.add_argument("--chunk-chars", type=int, default=defaults.chunk_chars)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--rpm", type=int, default=defaults.rpm)
+
+
+def config_from_args(args) -> MockConfig:
+    return MockConfig(
+        latency=args.latency,
+        token_rate=args.token_rate,
+        chunk_chars=args.chunk_chars,
+        error_rate=args.error_rate,
+        rpm=args.rpm,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 兼容的本地模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(args.host, args.port, config_from_args(args))
+    print(f"模拟服务已启动: {server.base_url}  模型名: {server.config.model}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# coding:utf-8
+"""翻译吞吐量基准测试：用本地模拟服务比较不同批次大小与并发设置下整集翻译的耗时
+
+    python -m benchmark.translate_benchmark --episodes 4 --batch-tokens 1000 3000 \\
+        --concurrency 1 4 --latency 0.5 --token-rate 80
+
+需在 Fairy-Kekkai-Workshop 目录下运行，不会修改已保存的配置。
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import itertools
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PySide6.QtCore import QCoreApplication
+
+from benchmark.mock_openai_server import (
+    MockOpenAIServer,
+    add_mock_arguments,
+    config_from_args,
+)
+
+
+def make_srt(cues: int) -> str:
+    """生成模拟字幕，台词长短不一
+
+    每条台词末尾加上编号，避免被去重合并，保证每条字幕都会发送给模型
+    """
+    lines = [
+        "おはようございます",
+        "今日は博麗神社で宴会があるそうですよ",
+        "魔理沙さん、また勝手に本を持っていきましたね",
+        "えっ",
+        "幻想郷の結界が少し緩んでいるみたいだから、ちょっと見てくるわ",
+    ]
+    blocks = []
+    for i in range(cues):
+        start, end = i * 3, i * 3 + 2
+        blocks.append(
+            f"{i + 1}\n"
+            f"00:{start // 60:02d}:{start % 60:02d},000 --> "
+            f"00:{end // 60:02d}:{end % 60:02d},500\n"
+            f"{lines[i % len(lines)]}（{i + 1}）"
+        )
+    return "\n\n".join(blocks)
+
+
+def run_case(ts, raw_content, episodes, jobs, output_dir):
+    """同时最多运行 jobs 个任务翻译 episodes 集，返回 (耗时秒数, 失败信息, 各批次统计)"""
+    tasks = [
+        ts.TranslateTask(
+            {
+                "srt_path": f"episode{i + 1}.srt",
+                "output_path": str(output_dir / f"episode{i + 1}.zh.srt"),
+                "raw_content": raw_content,
+                "AI": "custom-model",
+                "origin_lang": "日语",
+                "target_lang": "简体中文",
+                "temperature": 0.7,
+            }
+        )
+        for i in range(episodes)
+    ]
+    pending = list(tasks)
+    running = []
+    # 保留任务对象，直到排队的信号全部发出
+    finished = []
+    errors = []
+    batches = []
+
+    start = time.perf_counter()
+    # 翻译服务会打印提示词，测试时不输出
+    with contextlib.redirect_stdout(io.StringIO()):
+        while pending or running:
+            while pending and len(running) < jobs:
+                job = ts.TranslateJob(pending.pop(0))
+                job.finished_signal.connect(
+                    lambda ok, msg: None if ok else errors.append(msg)
+                )
+                job.start()
+                running.append(job)
+            QCoreApplication.processEvents()
+            time.sleep(0.005)
+            for job in [job for job in running if job._future.done()]:
+                running.remove(job)
+                finished.append(job)
+                batches.extend(job.batch_metrics)
+        elapsed = time.perf_counter() - start
+        # 处理剩余的信号
+        QCoreApplication.processEvents()
+    return elapsed, errors, batches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="翻译吞吐量基准测试")
+    parser.add_argument("--srt", type=Path, help="使用指定的字幕文件，默认生成模拟字幕")
+    parser.add_argument("--cues", type=int, default=300, help="模拟字幕的条数")
+    parser.add_argument("--episodes", type=int, default=1, help="翻译的集数")
+    parser.add_argument(
+        "--jobs", type=int, default=2, help="同时进行的翻译任务数（集数）"
+    )
+    parser.add_argument(
+        "--batch-tokens", type=int, nargs="+", default=[3000], help="批次 token 预算"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[4], help="同时进行的请求数"
+    )
+    parser.add_argument("--structured", action="store_true", help="使用结构化模式")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv)  # noqa: F841
+    # 只输出结果表格
+    logging.disable(logging.INFO)
+
+    from app.common.config import cfg
+    from app.service import translate_service as ts
+    from app.service.translate_metrics_service import (
+        TranslateMetricsStore,
+        summarize_batches,
+    )
+
+    server = MockOpenAIServer(config=config_from_args(args))
+    server.start_background()
+
+    for item, value in [
+        (cfg.customModelEnabled, True),
+        (cfg.customModelApiKey, "benchmark"),
+        (cfg.customModelBaseUrl, server.base_url),
+        (cfg.customModelName, server.config.model),
+        (cfg.customModelEndpoint, ""),
+        (cfg.useTranslationMemory, False),
+        (cfg.translateStructuredMode, args.structured),
+        (cfg.translateRequestsPerMinute, 0),
+    ]:
+        cfg.set(item, value, save=False)
+
+    raw_content = (
+        args.srt.read_text(encoding="utf-8").strip()
+        if args.srt
+        else make_srt(args.cues)
+    )
+    cues = len(raw_content.split("\n\n"))
+    print(
+        f"模拟服务: {server.base_url}  延迟 {args.latency}s  "
+        f"{args.token_rate} 块/秒  错误率 {args.error_rate}  限流 {args.rpm} 次/分"
+    )
+    print(f"{args.episodes} 集 × {cues} 条字幕，同时 {args.jobs} 集\n")
+    print(f"{'批次tokens':>10} {'并发':>4} {'耗时(s)':>8} {'条/秒':>7}  统计")
+
+    service_cls = ts.CustomModelService
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        # 统计写入临时数据库，不影响应用的模型对比数据
+        ts.TranslateMetricsStore = functools.partial(
+            TranslateMetricsStore, output_dir / "metrics.db"
+        )
+        for batch_tokens, concurrency in itertools.product(
+            args.batch_tokens, args.concurrency
+        ):
+            service_cls.max_batch_tokens = batch_tokens
+            service_cls.max_concurrency = concurrency
+            # 信号量按服务类缓存，改变并发数后需重建
+            service_cls._semaphores.pop(service_cls, None)
+
+            elapsed, errors, batches = run_case(
+                ts, raw_content, args.episodes, args.jobs, output_dir
+            )
+            summary = summarize_batches(batches)
+            if errors:
+                summary += f"  任务失败: {errors[0]}"
+            print(
+                f"{batch_tokens:>10} {concurrency:>4} {elapsed:>8.2f} "
+                f"{cues * args.episodes / elapsed:>7.1f}  {summary}"
+            )
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()